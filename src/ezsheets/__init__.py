@@ -4,18 +4,27 @@
 # IMPORTANT NOTE: This module has not been stress-tested for performance
 # and should not be considered "thread-safe" if multiple users are
 
-import pickle, re, collections, time
+import pickle, re, json, collections, collections.abc, functools, operator, time, csv, datetime, threading, contextlib, random, queue, itertools
+import concurrent.futures
 import os.path
 from googleapiclient.discovery import build
+from googleapiclient.http import MediaIoBaseDownload
+from googleapiclient.errors import HttpError
 from google_auth_oauthlib.flow import InstalledAppFlow
 from google.auth.transport.requests import Request
+import httplib2, google_auth_httplib2
 
 __version__ = '0.0.2'
 
 #SCOPES = ['https://www.googleapis.com/auth/spreadsheets.readonly']
-SCOPES = ['https://www.googleapis.com/auth/spreadsheets']
+SCOPES = ['https://www.googleapis.com/auth/spreadsheets',
+          'https://www.googleapis.com/auth/drive.readonly'] # Drive is needed to export spreadsheets as Excel/ODS/PDF/HTML files.
 SERVICE = None
+DRIVE_SERVICE = None
+CREDENTIALS = None
 IS_INITIALIZED = False
+_INIT_THREAD = None # The thread that called init(), which uses the services' own Http object.
+_THREAD_LOCAL = threading.local()
 
 DEFAULT_NEW_ROW_COUNT = 1000  # This is the Google Sheets default for a new Sheet.
 DEFAULT_NEW_COLUMN_COUNT = 26 # This is the Google Sheets default for a new Sheet.
@@ -24,53 +33,165 @@ DEFAULT_FROZEN_COLUMN_COUNT = 0
 DEFAULT_HIDE_GRID_LINES = False
 DEFAULT_ROW_GROUP_CONTROL_AFTER = False
 DEFAULT_COLUMN_GROUP_CONTROL_AFTER = False
+DEFAULT_GROWTH_POLICY = 'exact' # How many rows are added when a write needs more of them. See Sheet.growthPolicy.
+MAX_CELL_COUNT = 5000000 # Google Sheets' limit on the number of cells in a spreadsheet. Growth policies never grow a sheet past it.
+DEFAULT_VALUE_RENDER = 'formatted'
+DEFAULT_DATE_TIME_RENDER = 'serial'
+DEFAULT_WATCH_MIN_INTERVAL = 5.0  # Seconds between polls right after a change is seen.
+DEFAULT_WATCH_MAX_INTERVAL = 60.0 # Seconds between polls after the sheet has been quiet for a while.
+MAX_REQUEST_BYTES = 8 * 1024 * 1024 # Writes with more estimated JSON than this are split into several requests. Google rejects requests of about 10 MB.
+VALUE_RANGE_OVERHEAD_BYTES = 50 # The estimated JSON size of a ValueRange's keys, besides its range and values.
+DEFAULT_UPLOAD_WORKERS = 4 # The number of requests a split write sends in parallel.
+DEFAULT_LOAD_CHUNK_ROWS = 5000   # load() sends at most this many rows per request.
+DEFAULT_APPEND_CHUNK_ROWS = 5000 # appendRows() sends at most this many rows per request.
+DEFAULT_WRITE_BEHIND_FLUSH_INTERVAL = 1.0 # Seconds that a queued write waits before it's sent.
+DEFAULT_WRITE_BEHIND_FLUSH_CELLS = 10000   # Queued writes are sent early once they add up to this many cells.
+DEFAULT_WRITE_BEHIND_MAX_QUEUED = 10000    # Writes block once this many are waiting for the background thread.
+QUERY_BLOCK_ROWS = 4096 # Query predicates are evaluated a column at a time over blocks of this many rows.
+
+# Maps the valueRender and dateTimeRender arg values to the API's ValueRenderOption and DateTimeRenderOption values.
+# Details at https://developers.google.com/sheets/api/reference/rest/v4/ValueRenderOption
+VALUE_RENDER_OPTIONS = {'formatted': 'FORMATTED_VALUE', 'unformatted': 'UNFORMATTED_VALUE', 'formula': 'FORMULA'}
+DATE_TIME_RENDER_OPTIONS = {'serial': 'SERIAL_NUMBER', 'formatted': 'FORMATTED_STRING'}
+
+# Maps the sort order values of sort() to the API's SortOrder values.
+SORT_ORDERS = {'asc': 'ASCENDING', 'desc': 'DESCENDING'}
+
+# Maps the type arg values of SheetFormatter.numberFormat() and the alignment arg values of
+# SheetFormatter.horizontalAlignment() to the API's NumberFormatType and HorizontalAlign values.
+NUMBER_FORMAT_TYPES = ('NUMBER', 'TEXT', 'PERCENT', 'CURRENCY', 'DATE', 'TIME', 'DATE_TIME', 'SCIENTIFIC')
+HORIZONTAL_ALIGNMENTS = {'left': 'LEFT', 'center': 'CENTER', 'right': 'RIGHT'}
+
+# Maps the pasteType arg values of copyRange() to the API's PasteType values.
+PASTE_TYPES = {'normal': 'PASTE_NORMAL', 'values': 'PASTE_VALUES', 'format': 'PASTE_FORMAT', 'noBorders': 'PASTE_NO_BORDERS',
+               'formula': 'PASTE_FORMULA', 'dataValidation': 'PASTE_DATA_VALIDATION', 'conditionalFormatting': 'PASTE_CONDITIONAL_FORMATTING'}
 
 from ezsheets.colorvalues import COLORS
 
 # Quota throttling:
-_READ_REQUESTS = collections.deque()
-_WRITE_REQUESTS = collections.deque()
 READ_QUOTA = 50 # 50 reads per 100 seconds
 WRITE_QUOTA = 50 # 50 writes per 100 seconds
+QUOTA_WINDOW = 100 # Seconds
+DEFAULT_FANOUT_CONCURRENCY = 8 # The number of spreadsheets fanout() works on at once.
+
+DEFAULT_EXPORT_ROW_GROUP_SIZE = 10000 # Rows per Arrow record batch / Parquet row group when exporting.
+DEFAULT_DOWNLOAD_WINDOW_ROWS = 5000   # Rows per values().get request when streaming a sheet to a CSV/TSV file.
+DEFAULT_DOWNLOAD_CHUNK_SIZE = 10 * 1024 * 1024 # Bytes per chunk when downloading a Drive export.
+DEFAULT_DOWNLOAD_NUM_RETRIES = 3
+BATCH_HTTP_MAX_REQUESTS = 100 # Google allows up to 1000 calls in a batch HTTP request, but recommends fewer.
+
+EXCEL_MIME_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+ODS_MIME_TYPE = 'application/x-vnd.oasis.opendocument.spreadsheet'
+PDF_MIME_TYPE = 'application/pdf'
+HTML_MIME_TYPE = 'application/zip' # Google Drive exports spreadsheets as HTML in a zip file, one .html file per sheet.
 
 """
 Features to add:
 - delete spreadsheets
-- download as csv/excel/whatever
 """
 
 
 # Sample spreadsheet id: 16RWH9XBBwd8pRYZDSo9EontzdVPqxdGnwM5MnP6T48c
 
-def _logWriteRequest():
+class QuotaScheduler():
     """
-    Logs a write request to the `_WRITE_REQUESTS` deque. This function should be
-    called whenever a Google Sheets write request is made. It will also throttle
-    requests based on the quota in WRITE_QUOTA.
+    Paces Google Sheets API requests from every thread so that no more than
+    READ_QUOTA reads and WRITE_QUOTA writes are made in any QUOTA_WINDOW
+    seconds. Each request reserves the earliest time slot that keeps
+    within the quota, and the thread that made it sleeps until that slot, so
+    waiting threads take turns instead of all waking up at once. ezsheets
+    uses a single QuotaScheduler, `QUOTA_SCHEDULER`, for all requests.
     """
-    _WRITE_REQUESTS.append(time.time())
-    while _WRITE_REQUESTS[0] < time.time() - 100:
-        _WRITE_REQUESTS.popleft() # Get rid of all entries older than 100 seconds.
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.readRequests = collections.deque() # The times of the reads in the current window, including reserved future slots.
+        self.writeRequests = collections.deque()
+        self.readCount = 0 # The total number of reads and writes logged, for measuring throughput.
+        self.writeCount = 0
+
+    def acquireRead(self):
+        """
+        Reserves a slot for a read request, then sleeps until that slot so the
+        read doesn't exceed READ_QUOTA. Call this before sending the request.
+        """
+        with self._lock:
+            self.readCount += 1
+            slot = self._reserveSlot(self.readRequests, READ_QUOTA)
+        _countThreadRequest()
+        self._sleepUntil(slot)
+
+    def acquireWrite(self):
+        """
+        Reserves a slot for a write request, then sleeps until that slot so the
+        write doesn't exceed WRITE_QUOTA. Call this before sending the request.
+        """
+        with self._lock:
+            self.writeCount += 1
+            slot = self._reserveSlot(self.writeRequests, WRITE_QUOTA)
+        _countThreadRequest()
+        self._sleepUntil(slot)
+
+    def _reserveSlot(self, requests, quota):
+        now = time.time()
+        while requests and requests[0] < now - QUOTA_WINDOW:
+            requests.popleft() # Get rid of all entries older than the window.
+        if len(requests) < quota:
+            slot = now
+        else:
+            slot = max(now, requests[-quota] + QUOTA_WINDOW) # The slot where the quota-th latest request leaves the window.
+        requests.append(slot)
+        return slot
 
-    while len(_WRITE_REQUESTS) > WRITE_QUOTA: # pragma: no cover
-        time.sleep(1)
-        while _WRITE_REQUESTS[0] < time.time() - 100:
-            _WRITE_REQUESTS.popleft() # Get rid of all entries older than 100 seconds.
+    def _sleepUntil(self, slot):
+        delay = slot - time.time()
+        if delay > 0: # pragma: no cover
+            time.sleep(delay)
 
-def _logReadRequests():
+
+QUOTA_SCHEDULER = QuotaScheduler()
+_READ_REQUESTS = QUOTA_SCHEDULER.readRequests
+_WRITE_REQUESTS = QUOTA_SCHEDULER.writeRequests
+
+
+def _acquireWriteQuota():
+    """
+    Waits for a write slot from `QUOTA_SCHEDULER`. This function should be
+    called right before every Google Sheets write request is sent, so that
+    requests are throttled based on the quota in WRITE_QUOTA.
     """
-    Logs a read request to the `_READ_REQUESTS` deque. This function should be
-    called whenever a Google Sheets read request is made. It will also throttle
-    requests based on the quota in READ_QUOTA.
+    QUOTA_SCHEDULER.acquireWrite()
+
+def _acquireReadQuota():
+    """
+    Waits for a read slot from `QUOTA_SCHEDULER`. This function should be
+    called right before every Google Sheets read request is sent, so that
+    requests are throttled based on the quota in READ_QUOTA.
     """
-    _READ_REQUESTS.append(time.time())
-    while _READ_REQUESTS[0] < time.time() - 100:
-        _READ_REQUESTS.popleft() # Get rid of all entries older than 100 seconds
+    QUOTA_SCHEDULER.acquireRead()
+
+def _countThreadRequest():
+    # Counts the request against the current thread, so fanout() can tell its own requests apart from other threads'.
+    _THREAD_LOCAL.requestCount = _getThreadRequestCount() + 1
+
+def _getThreadRequestCount():
+    return getattr(_THREAD_LOCAL, 'requestCount', 0)
 
-    while len(_READ_REQUESTS) > READ_QUOTA: # pragma: no cover
-        time.sleep(1)
-        while _READ_REQUESTS[0] < time.time() - 100:
-            _READ_REQUESTS.popleft() # Get rid of all entries older than 100 seconds
+
+def _getHttp():
+    """
+    Returns the Http object that API requests made by the current thread
+    should be executed with. httplib2.Http objects aren't thread-safe, so
+    threads other than the one that called `init()` (such as the threads of
+    Sheet.watch()) each get their own. Returns None for the thread that called
+    init(), which means the request uses the service's Http object.
+    """
+    if threading.current_thread() is _INIT_THREAD:
+        return None
+    http = getattr(_THREAD_LOCAL, 'http', None)
+    if http is None:
+        http = google_auth_httplib2.AuthorizedHttp(CREDENTIALS, http=httplib2.Http())
+        _THREAD_LOCAL.http = http
+    return http
 
 
 class EZSheetsException(Exception):
@@ -80,30 +201,78 @@ class EZSheetsException(Exception):
     pass
 
 
+class PartialWriteError(EZSheetsException):
+    """
+    Raised when a write that was too large for one request was split into
+    bands of rows (or columns) and some of the bands failed. The bands in
+    `succeededRanges` were written; the ones in `failedRanges` were not, and
+    `errors` has the exceptions of the ones that were sent. (When the bands
+    overlap, they're sent in order and the bands after a failed one aren't
+    sent.) Call `resume()` to retry just the failed bands. The local data of the sheet isn't updated by the failed write, so
+    refresh the sheet after resuming.
+    """
+    def __init__(self, spreadsheet, succeededGroups, failedGroups, errors, ordered=False):
+        self.spreadsheet = spreadsheet
+        self.succeededRanges = [valueRange['range'] for group in succeededGroups for valueRange in group]
+        self.failedRanges = [valueRange['range'] for group in failedGroups for valueRange in group]
+        self.errors = errors
+        self._failedGroups = failedGroups
+        self._ordered = ordered
+        super(PartialWriteError, self).__init__('%s of %s bands failed to be written, starting with %s: %s' % (
+            len(failedGroups), len(succeededGroups) + len(failedGroups), self.failedRanges[0], errors[0]))
+
+    def resume(self, workers=DEFAULT_UPLOAD_WORKERS):
+        """
+        Sends the failed bands again. Raises a new PartialWriteError if some
+        of them fail again.
+        """
+        self.spreadsheet._uploadValueRangeGroups(self._failedGroups, workers, self._ordered)
+
+
 class Spreadsheet():
     """
     This class represents a Spreadsheet on Google Sheets. Spreadsheets can
     contain one or more sheets, also called worksheets.
     """
-    def __init__(self, spreadsheetId):
+    def __init__(self, spreadsheetId, valueRender=DEFAULT_VALUE_RENDER, dateTimeRender=DEFAULT_DATE_TIME_RENDER):
         """
         Initializer for Spreadsheet objects.
 
         :param spreadsheetId: The ID or URL of the spreadsheet on Google Sheets. E.g. `'https://docs.google.com/spreadsheets/d/10tRbpHZYkfRecHyRHRjBLdQYoq5QWNBqZmH9tt4Tjng/edit#gid=0'` or `'10tRbpHZYkfRecHyRHRjBLdQYoq5QWNBqZmH9tt4Tjng'`
+        :param valueRender: How cell values are read for this spreadsheet's sheets: 'formatted' (strings as displayed), 'unformatted' (ints, floats, and bools), or 'formula'.
+        :param dateTimeRender: How dates are read when valueRender isn't 'formatted': 'serial' (serial number floats, see `convertSerialToDatetime()`) or 'formatted' (strings).
         """
         if not IS_INITIALIZED: init() # Initialize this module if not done so already.
 
+        _checkRenderArgs(valueRender, dateTimeRender)
         self._spreadsheetId = getIdFromUrl(spreadsheetId)
+        self._valueRender = valueRender
+        self._dateTimeRender = dateTimeRender
+        self._driveVersion = None # The Drive version of the spreadsheet when it was last refreshed with skipIfUnchanged.
+        self._batchRequests = None # While a structuralBatch() is active, a list of the queued batchUpdate request dicts.
+        self._batchCallbacks = None # While a structuralBatch() is active, a list of (callback, firstReplyIndex, replyCount) tuples.
+        self._writeBehind = None # The WriteBehindQueue made by writeBehind(), while it's open.
         self.sheets = ()
         self.refresh()
 
-    def refresh(self):
+    def refresh(self, skipIfUnchanged=False):
         """
         Updates the local Spreadsheet and Sheet objects with the current state
-        of the spreadsheet and sheets on Google Plus.
+        of the spreadsheet and sheets on Google Sheets. The data of all the
+        sheets is read with a single request.
+
+        :param skipIfUnchanged: If True, first check the spreadsheet's version on Google Drive (which doesn't count against the Google Sheets read quota) and return without reading anything if it hasn't changed since the last refresh that used skipIfUnchanged.
         """
+        if skipIfUnchanged:
+            driveVersion = self._getDriveVersion()
+            if driveVersion == self._driveVersion:
+                return # Nothing has changed since the last refresh.
+        else:
+            driveVersion = None
+
         request = SERVICE.spreadsheets().get(spreadsheetId=self._spreadsheetId)
-        response = request.execute(); _logReadRequests()
+        _acquireReadQuota()
+        response = request.execute(http=_getHttp())
 
         self._title = response['properties']['title']
         
@@ -125,13 +294,266 @@ class Spreadsheet():
                 # If the sheet has been previously loaded, reuse that Sheet object:
                 replacementSheetsAttr.append(self.sheets[existingSheetIndex])
                 self.sheets[existingSheetIndex]._refreshPropertiesWithSheetPropertiesDict(sheetInfo['properties'])
-                self.sheets[existingSheetIndex]._refreshData()
             else:
-                # If the sheet hasn't been seen before, create a new Sheet object:
-                replacementSheetsAttr.append(Sheet(self, sheetId)) # TODO - would be nice to reuse the info in `response` for this instead of letting the ctor make another request, but this isn't that important.
+                # If the sheet hasn't been seen before, create a new Sheet object from the properties in `response`:
+                replacementSheetsAttr.append(Sheet._fromSheetProperties(self, sheetInfo['properties'], cells={}))
 
         del sheetIDS
         self.sheets = tuple(replacementSheetsAttr) # Make sheets attribute an immutable tuple.
+        self._refreshSheetsData(self.sheets)
+
+        self._driveVersion = driveVersion
+        for sheet in self.sheets:
+            sheet._driveVersion = driveVersion
+
+
+    @contextlib.contextmanager
+    def structuralBatch(self):
+        """
+        Returns a context manager that queues the structural changes made in
+        its `with` block and sends them all in one batchUpdate request at the
+        end of the block, instead of one request (and often a full refresh)
+        each:
+
+        >>> with spreadsheet.structuralBatch():
+        ...     spreadsheet.title = 'Q3 Report'
+        ...     for name in customerNames:
+        ...         sheet = spreadsheet.addSheet(title=name)
+        ...         sheet.tabColor = 'light gray'
+        ...         sheet.frozenRowCount = 1
+
+        Setting a spreadsheet's or sheet's `title`, a sheet's `tabColor`,
+        `index`, or grid properties, and calling `addSheet()`, `resize()`,
+        `Sheet.delete()`, or `SheetFormatter.apply()` are batched. The local Spreadsheet and Sheet objects
+        are updated right away, so later changes in the block see them. Cell
+        values are not part of the batch: writing cells in the block (or
+        anything else that needs the sheets to exist on Google Sheets, like
+        sorting or refreshing) first sends the structural changes queued so
+        far, then sends its own requests immediately.
+
+        If the block raises an exception, the changes still queued aren't
+        sent. If the block raises an exception or a batchUpdate request
+        fails, the spreadsheet is refreshed to undo the unsent local
+        changes. Nested
+        structuralBatch() blocks join the outermost one.
+        """
+        if self._batchRequests is not None:
+            yield # This is a nested block, so the outer block sends the requests.
+            return
+
+        self._batchRequests = []
+        self._batchCallbacks = []
+        try:
+            yield
+            requests, callbacks = self._batchRequests, self._batchCallbacks
+        except:
+            if self._batchRequests:
+                self._batchRequests = self._batchCallbacks = None
+                self.refresh() # Undo the local changes made in the block.
+            raise
+        finally:
+            self._batchRequests = self._batchCallbacks = None
+
+        self._sendBatchRequests(requests, callbacks)
+
+
+    def _flushStructuralBatch(self):
+        # Sends the requests queued so far by an active structuralBatch(), so
+        # that values writes and other requests sent right away in the block
+        # can use the sheets and grid sizes it creates. Later structural
+        # changes in the block are queued again.
+        if not self._batchRequests:
+            return
+        requests, callbacks = self._batchRequests, self._batchCallbacks
+        self._batchRequests, self._batchCallbacks = [], []
+        self._sendBatchRequests(requests, callbacks)
+
+
+    def _sendBatchRequests(self, requests, callbacks):
+        # Sends the requests queued by structuralBatch() in one batchUpdate request and calls their callbacks.
+        if not requests:
+            return
+        self._flushWriteBehind() # Queued writes name cells by the current titles and sizes, so they must go out first.
+        try:
+            request = SERVICE.spreadsheets().batchUpdate(spreadsheetId=self._spreadsheetId, body={'requests': requests})
+            _acquireWriteQuota()
+            response = request.execute(http=_getHttp())
+        except:
+            self.refresh() # The batchUpdate is all-or-nothing, so none of the local changes happened on Google Sheets.
+            raise
+
+        replies = response.get('replies', [])
+        for callback, firstReplyIndex, replyCount in callbacks:
+            callback(replies[firstReplyIndex:firstReplyIndex + replyCount])
+
+
+    def _batchUpdate(self, requests, callback=None):
+        # Sends a list of batchUpdate request dicts, or queues them if a
+        # structuralBatch() is active. `callback`, if given, is called with
+        # the list of replies to these requests once they've been sent.
+        if self._batchRequests is not None:
+            if callback is not None:
+                self._batchCallbacks.append((callback, len(self._batchRequests), len(requests)))
+            self._batchRequests.extend(requests)
+            return
+
+        self._flushWriteBehind() # Queued writes name cells by the current titles and sizes, so they must go out first.
+        request = SERVICE.spreadsheets().batchUpdate(spreadsheetId=self._spreadsheetId, body={'requests': requests})
+        _acquireWriteQuota()
+        response = request.execute(http=_getHttp())
+        if callback is not None:
+            callback(response.get('replies', []))
+
+
+    def _updateValues(self, valueRanges):
+        # Writes a list of ValueRange dicts (with 'range', 'majorDimension', and
+        # 'values' keys) with one request, or queues them if writeBehind() is on.
+        self._flushStructuralBatch() # The writes may be to sheets or cells that a structuralBatch() hasn't created yet.
+        if self._writeBehind is not None:
+            for valueRange in valueRanges:
+                self._writeBehind.put(valueRange)
+            return
+
+        self._sendValueRanges(valueRanges)
+
+
+    def _sendValueRanges(self, valueRanges, workers=DEFAULT_UPLOAD_WORKERS, ordered=False):
+        # Writes a list of ValueRange dicts with one request, or if their
+        # total estimated size is over MAX_REQUEST_BYTES, splits the large
+        # ones into bands and sends groups of bands (and small ValueRanges)
+        # that fit in a request, `workers` at a time.
+        # If `ordered` is True or some of the ValueRanges overlap, the groups
+        # are sent one at a time in order, so later writes win.
+        bands = []
+        for valueRange in valueRanges:
+            for band, bandBytes in _splitValueRange(valueRange, MAX_REQUEST_BYTES):
+                # Each ValueRange also adds its range and keys to the request, which matters for thousands of small ones:
+                bands.append((band, bandBytes + len(band['range']) + VALUE_RANGE_OVERHEAD_BYTES))
+        if sum(bandBytes for band, bandBytes in bands) <= MAX_REQUEST_BYTES:
+            self._sendValueRangeGroup(valueRanges) # Everything fits in one request.
+            return
+
+        groups = [] # Lists of bands, each small enough for one request.
+        groupBytes = 0
+        for band, bandBytes in bands:
+            if not groups or groupBytes + bandBytes > MAX_REQUEST_BYTES:
+                groups.append([])
+                groupBytes = 0
+            groups[-1].append(band)
+            groupBytes += bandBytes
+        self._uploadValueRangeGroups(groups, workers, ordered or _valueRangesOverlap(valueRanges))
+
+
+    def _uploadValueRangeGroups(self, groups, workers, ordered=False):
+        # Sends each list of ValueRange dicts in `groups` as one request, in
+        # parallel unless `ordered` is True. Ordered groups are sent one at a
+        # time, and the groups after a failed one aren't sent, so that
+        # resuming can't overwrite newer values with older ones. Raises
+        # PartialWriteError if any of them fail.
+        if len(groups) == 1 or workers == 1 or ordered:
+            results = []
+            for group in groups:
+                try:
+                    self._sendValueRangeGroup(group)
+                    results.append(None)
+                except Exception as exc:
+                    results.append(exc)
+                    if ordered:
+                        break
+        else:
+            with concurrent.futures.ThreadPoolExecutor(min(workers, len(groups))) as executor:
+                futures = [executor.submit(self._sendValueRangeGroup, group) for group in groups]
+                results = [future.exception() for future in futures]
+
+        failedGroups = [group for group, exc in zip(groups, results) if exc is not None] + groups[len(results):] # Including unsent ordered groups.
+        if failedGroups:
+            if len(groups) == 1:
+                raise results[0] # An unsplit write fails the same way it always has.
+            raise PartialWriteError(self, [group for group, exc in zip(groups, results) if exc is None],
+                                    failedGroups, [exc for exc in results if exc is not None], ordered)
+
+
+    def _sendValueRangeGroup(self, valueRanges):
+        # Writes a list of ValueRange dicts with one request, from whichever thread calls this.
+        if len(valueRanges) == 1:
+            request = SERVICE.spreadsheets().values().update(
+                spreadsheetId=self._spreadsheetId,
+                range=valueRanges[0]['range'],
+                valueInputOption='USER_ENTERED', # Details at https://developers.google.com/sheets/api/reference/rest/v4/ValueInputOption
+                body={
+                    'majorDimension': valueRanges[0]['majorDimension'],
+                    'values': valueRanges[0]['values'],
+                    }
+                )
+        else:
+            request = SERVICE.spreadsheets().values().batchUpdate(spreadsheetId=self._spreadsheetId,
+                body={
+                    'valueInputOption': 'USER_ENTERED', # Details at https://developers.google.com/sheets/api/reference/rest/v4/ValueInputOption
+                    'data': valueRanges})
+        _acquireWriteQuota()
+        request.execute(http=_getHttp())
+
+
+    def writeBehind(self, flushInterval=DEFAULT_WRITE_BEHIND_FLUSH_INTERVAL, flushCells=DEFAULT_WRITE_BEHIND_FLUSH_CELLS,
+                    maxQueued=DEFAULT_WRITE_BEHIND_MAX_QUEUED, onError=None):
+        """
+        Turns on write-behind mode and returns its WriteBehindQueue object. In
+        this mode, the update*(), upsertRows(), and clear() methods of this
+        spreadsheet's sheets change the local data right away and return
+        without waiting for Google Sheets. A background thread sends the
+        queued writes in one values().batchUpdate request once the oldest
+        has waited `flushInterval` seconds or they add up to `flushCells`
+        cells, whichever comes first. Writes to the same range are coalesced.
+
+        Call `flush()` on the returned object to wait until everything
+        written so far is on Google Sheets, and `close()` (or use it in a
+        `with` statement) to flush and turn write-behind mode off. Writes
+        still queued when the program exits without closing are lost.
+        Refreshing a sheet flushes first, so the local data isn't replaced
+        with data that's missing the queued writes.
+
+        :param maxQueued: Writes block once this many are waiting for the background thread.
+        :param onError: If given, called with the exception and the list of ValueRange dicts that failed to be written. Otherwise the exception is raised by the next `flush()` or `close()`.
+        """
+        if self._writeBehind is not None:
+            raise EZSheetsException('write-behind mode is already on for this spreadsheet')
+        self._writeBehind = WriteBehindQueue(self, flushInterval, flushCells, maxQueued, onError)
+        self._writeBehind.start()
+        return self._writeBehind
+
+
+    def _flushWriteBehind(self):
+        # Sends any queued structural changes and waits for any queued writes to be sent, before
+        # the local data is replaced by a read or a request works on what's on Google Sheets.
+        self._flushStructuralBatch()
+        if self._writeBehind is not None:
+            self._writeBehind.flush()
+
+
+    def _getDriveVersion(self):
+        # Returns the spreadsheet's version number on Google Drive, which increases whenever the spreadsheet changes.
+        response = DRIVE_SERVICE.files().get(fileId=self._spreadsheetId, fields='version').execute(http=_getHttp())
+        return response['version']
+
+
+    def _refreshSheetsData(self, sheets):
+        # Reads the data of all of `sheets` with one values().batchGet request per render mode.
+        self._flushWriteBehind()
+        sheetsByRender = collections.OrderedDict()
+        for sheet in sheets:
+            sheetsByRender.setdefault((sheet._valueRender, sheet._dateTimeRender), []).append(sheet)
+
+        for (valueRender, dateTimeRender), sheetsToRead in sheetsByRender.items():
+            _acquireReadQuota()
+            response = SERVICE.spreadsheets().values().batchGet(
+                spreadsheetId=self._spreadsheetId,
+                ranges=[_formatA1Range(sheet._title, 1, 1, sheet._columnCount, sheet._rowCount) for sheet in sheetsToRead],
+                valueRenderOption=VALUE_RENDER_OPTIONS[valueRender],
+                dateTimeRenderOption=DATE_TIME_RENDER_OPTIONS[dateTimeRender]).execute(http=_getHttp())
+
+            # The API returns the value ranges in the same order they were requested.
+            for sheet, valueRange in zip(sheetsToRead, response.get('valueRanges', [])):
+                sheet._setCellsFromValueRange(valueRange)
 
 
     def __getitem__(self, key):
@@ -169,18 +591,38 @@ class Spreadsheet():
                 return # When deleting list items with a slice, a negative start or stop results in a no-op. I'll mimic that behavior here.
 
             indexesToDelete = [i for i in range(start, stop, step) if i >= 0 and i < len(self.sheets)] # Don't include invalid or negative indexes.
-            if len(indexesToDelete) == len(self.sheets):
-                raise ValueError('Cannot delete all sheets; spreadsheets must have at least one sheet')
-
-            if indexesToDelete[0] < indexesToDelete[-1]:
-                indexesToDelete.reverse() # We want this is descending order.
-
-            for i in indexesToDelete:
-                self.sheets[i].delete()
+            self.deleteSheets(indexesToDelete)
 
         else:
             raise TypeError('key must be an int index, str sheet title, or slice object, not %r' % (type(key).__name__))
 
+    def deleteSheets(self, sheets):
+        """
+        Deletes several sheets with one batchUpdate request and removes them
+        from `sheets` without refreshing the spreadsheet.
+
+        :param sheets: A list of Sheet objects, int indexes, or str titles.
+        """
+        if not isinstance(sheets, (list, tuple)):
+            raise TypeError('sheets arg must be a list of Sheet objects, int indexes, or str titles, not %s' % (type(sheets).__name__))
+
+        sheetsToDelete = collections.OrderedDict() # Maps sheetIds to Sheet objects, so a sheet listed twice is only deleted once.
+        for sheet in sheets:
+            if not isinstance(sheet, Sheet):
+                sheet = self[sheet]
+            elif sheet._spreadsheet is not self:
+                raise ValueError('sheet %r is not in this spreadsheet' % (sheet.title))
+            sheetsToDelete[sheet._sheetId] = sheet
+        if len(sheetsToDelete) == 0:
+            return
+        if len(sheetsToDelete) == len(self.sheets):
+            raise ValueError('Cannot delete all sheets; spreadsheets must have at least one sheet')
+
+        with self.structuralBatch():
+            for sheet in sheetsToDelete.values():
+                sheet.delete()
+
+
     def __len__(self):
         """
         returns the number of sheets in the spreadsheet object.
@@ -204,6 +646,39 @@ class Spreadsheet():
         """
         return self._spreadsheetId
 
+    @property
+    def valueRender(self):
+        """
+        returns how cell values are read for the sheets in this spreadsheet:
+        'formatted', 'unformatted', or 'formula'. Setting this sets and
+        re-reads the data of every sheet.
+        """
+        return self._valueRender
+
+    @valueRender.setter
+    def valueRender(self, value):
+        _checkRenderArgs(value, self._dateTimeRender)
+        self._valueRender = value
+        for sheet in self.sheets:
+            sheet._valueRender = value
+        self._refreshSheetsData(self.sheets) # Re-read every sheet with one batchGet request.
+
+    @property
+    def dateTimeRender(self):
+        """
+        returns how dates are read for the sheets in this spreadsheet: 'serial'
+        or 'formatted'. Setting this sets and re-reads the data of every sheet.
+        """
+        return self._dateTimeRender
+
+    @dateTimeRender.setter
+    def dateTimeRender(self, value):
+        _checkRenderArgs(self._valueRender, value)
+        self._dateTimeRender = value
+        for sheet in self.sheets:
+            sheet._dateTimeRender = value
+        self._refreshSheetsData(self.sheets) # Re-read every sheet with one batchGet request.
+
     @property
     def sheetTitles(self):
         """
@@ -241,30 +716,230 @@ class Spreadsheet():
     @title.setter
     def title(self, value):
         value = str(value)
-        request = SERVICE.spreadsheets().batchUpdate(spreadsheetId=self._spreadsheetId,
-        body={
-            'requests': [{'updateSpreadsheetProperties': {'properties': {'title': value},
-                                                          'fields': 'title'}}]})
-        request.execute(); _logWriteRequest()
+        self._batchUpdate([{'updateSpreadsheetProperties': {'properties': {'title': value},
+                                                            'fields': 'title'}}])
         self._title = value
 
 
     def addSheet(self, title='', index=None, columnCount=DEFAULT_NEW_COLUMN_COUNT, rowCount=DEFAULT_NEW_ROW_COUNT):
         """
-        TODO
+        Adds a new sheet to the spreadsheet with one addSheet request and
+        returns its Sheet object. The new sheet is added to `sheets` without
+        refreshing the spreadsheet.
+
+        :param title: The title of the new sheet. Defaults to a title like 'Sheet2' chosen by Google Sheets.
+        :param index: Where to insert the new sheet. Defaults to the end.
+        :param columnCount: The number of columns in the new sheet.
+        :param rowCount: The number of rows in the new sheet.
         """
         if index is None:
             # Set the index to make this new sheet be the last sheet:
             index = len(self.sheets)
+        if isinstance(columnCount, str):
+            columnCount = getColumnNumber(columnCount)
+        for argName, value in (('index', index), ('columnCount', columnCount), ('rowCount', rowCount)):
+            if not isinstance(value, int):
+                raise TypeError('%s arg must be an int, not %s' % (argName, type(value).__name__))
+        if columnCount < 1 or rowCount < 1:
+            raise ValueError('columnCount and rowCount args must be positive nonzero ints, not %r and %r' % (columnCount, rowCount))
+
+        # The sheetId is chosen here rather than by Google Sheets so that the
+        # new sheet can be changed before a structuralBatch() sends the request.
+        sheetProperties = {'sheetId': self._getNewSheetId(), 'title': str(title), 'index': index,
+                           'gridProperties': {'rowCount': rowCount, 'columnCount': columnCount}}
+        newSheet = Sheet._fromSheetProperties(self, sheetProperties, cells={})
+
+        def updateTitle(replies):
+            newSheet._title = replies[0]['addSheet']['properties']['title'] # Google Sheets names untitled sheets like 'Sheet2'.
+        self._batchUpdate([{'addSheet': {'properties': sheetProperties}}], updateTitle)
+        self._insertSheetLocally(newSheet)
+        return newSheet
+
+
+    def addSheets(self, sheets):
+        """
+        Adds several new sheets to the spreadsheet with one batchUpdate request
+        and returns a list of their Sheet objects.
+
+        >>> spreadsheet.addSheets(['Customer A', 'Customer B', {'title': 'Totals', 'index': 0, 'rowCount': 50}])
+
+        :param sheets: A list of titles, or of dicts of `addSheet()` keyword args.
+        """
+        if not isinstance(sheets, (list, tuple)):
+            raise TypeError('sheets arg must be a list of titles or dicts, not %s' % (type(sheets).__name__))
+        for sheetArgs in sheets:
+            if not isinstance(sheetArgs, (str, dict)):
+                raise TypeError('sheets arg must be a list of titles or dicts, not a list containing %s' % (type(sheetArgs).__name__))
+
+        newSheets = []
+        with self.structuralBatch():
+            for sheetArgs in sheets:
+                if isinstance(sheetArgs, str):
+                    newSheets.append(self.addSheet(title=sheetArgs))
+                else:
+                    newSheets.append(self.addSheet(**sheetArgs))
+        return newSheets
+
+
+    def _getNewSheetId(self):
+        # Returns a random sheetId that isn't used by any of this spreadsheet's sheets.
+        sheetIds = set(sheet._sheetId for sheet in self.sheets)
+        while True:
+            sheetId = random.randint(1, 2 ** 31 - 1)
+            if sheetId not in sheetIds:
+                return sheetId
+
+
+    def duplicateSheet(self, sheet, title=None, index=None):
+        """
+        Makes a copy of one of this spreadsheet's sheets with one duplicateSheet
+        request and returns the new Sheet object. The new sheet's data is
+        copied from the local data of `sheet` rather than downloaded.
+
+        :param sheet: A Sheet object, int index, or str title of the sheet to copy.
+        :param title: The title of the new sheet. Defaults to a title like 'Copy of Sheet1'.
+        :param index: Where to insert the new sheet. Defaults to right after `sheet`.
+        """
+        if not isinstance(sheet, Sheet):
+            sheet = self[sheet]
+        if index is None:
+            index = sheet.index + 1
 
+        duplicateSheetArgs = {'sourceSheetId': sheet.sheetId, 'insertSheetIndex': index}
+        if title is not None:
+            duplicateSheetArgs['newSheetName'] = str(title)
+        self._flushWriteBehind() # The copy is made from what's on Google Sheets, so queued writes must be sent first.
         request = SERVICE.spreadsheets().batchUpdate(spreadsheetId=self._spreadsheetId,
         body={
-            'requests': [{'addSheet': {'properties': {'title': title, 'index': index}}}]})
-        request.execute(); _logWriteRequest()
+            'requests': [{'duplicateSheet': duplicateSheetArgs}]})
+        _acquireWriteQuota()
+        response = request.execute(http=_getHttp())
+
+        newSheet = Sheet._fromSheetProperties(self, response['replies'][0]['duplicateSheet']['properties'], sheet._copyCellsFor(self))
+        self._insertSheetLocally(newSheet)
+        return newSheet
+
+
+    def _insertSheetLocally(self, newSheet):
+        # Adds a new Sheet object to self.sheets at its index, without refreshing.
+        sheets = [sheet for sheet in self.sheets if sheet.sheetId != newSheet.sheetId]
+        sheets.insert(min(newSheet._index, len(sheets)), newSheet)
+        self._setSheetsLocally(sheets)
+
+
+    def _setSheetsLocally(self, sheets):
+        # Replaces self.sheets and updates each Sheet object's index to match its position.
+        for i, sheet in enumerate(sheets):
+            sheet._index = i
+        self.sheets = tuple(sheets) # Make sheets attribute an immutable tuple.
+
+
+    def downloadAsExcel(self, filename=None, chunkSize=DEFAULT_DOWNLOAD_CHUNK_SIZE, progressCallback=None):
+        """
+        Downloads the spreadsheet as an Excel .xlsx file. See `_downloadAs()` for details.
+
+        :returns: str - the filename written to, or None if a file object was passed.
+        """
+        return self._downloadAs(EXCEL_MIME_TYPE, '.xlsx', filename, chunkSize, progressCallback)
+
+
+    def downloadAsODS(self, filename=None, chunkSize=DEFAULT_DOWNLOAD_CHUNK_SIZE, progressCallback=None):
+        """
+        Downloads the spreadsheet as an OpenDocument .ods file. See `_downloadAs()` for details.
+
+        :returns: str - the filename written to, or None if a file object was passed.
+        """
+        return self._downloadAs(ODS_MIME_TYPE, '.ods', filename, chunkSize, progressCallback)
+
+
+    def downloadAsPDF(self, filename=None, chunkSize=DEFAULT_DOWNLOAD_CHUNK_SIZE, progressCallback=None):
+        """
+        Downloads the spreadsheet as a .pdf file. See `_downloadAs()` for details.
+
+        :returns: str - the filename written to, or None if a file object was passed.
+        """
+        return self._downloadAs(PDF_MIME_TYPE, '.pdf', filename, chunkSize, progressCallback)
+
+
+    def downloadAsHTML(self, filename=None, chunkSize=DEFAULT_DOWNLOAD_CHUNK_SIZE, progressCallback=None):
+        """
+        Downloads the spreadsheet as a .zip file containing one .html file per
+        sheet. See `_downloadAs()` for details.
+
+        :returns: str - the filename written to, or None if a file object was passed.
+        """
+        return self._downloadAs(HTML_MIME_TYPE, '.zip', filename, chunkSize, progressCallback)
+
+
+    def _downloadAs(self, mimeType, extension, filename, chunkSize, progressCallback):
+        """
+        Exports the spreadsheet through Google Drive and writes it to `filename`
+        `chunkSize` bytes at a time, so the export is never held in memory.
+        Each chunk is retried up to DEFAULT_DOWNLOAD_NUM_RETRIES times.
+
+        :param filename: A filename str or an open binary-mode file object. Defaults to the spreadsheet's title plus the extension.
+        :param progressCallback: If given, called after each chunk with a float from 0.0 to 1.0.
+        """
+        if not isinstance(chunkSize, int):
+            raise TypeError('chunkSize arg must be an int, not %s' % (type(chunkSize).__name__))
+        if chunkSize < 1:
+            raise ValueError('chunkSize arg must be at least 1, not %r' % (chunkSize))
+
+        if filename is None:
+            filename = _getSafeFilename(self._title) + extension
+
+        if isinstance(filename, str):
+            with open(filename, 'wb') as fileObj:
+                self._downloadExportTo(fileObj, mimeType, chunkSize, progressCallback)
+            return filename
+        else:
+            self._downloadExportTo(filename, mimeType, chunkSize, progressCallback)
+            return None
+
+
+    def _downloadExportTo(self, fileObj, mimeType, chunkSize, progressCallback):
+        self._flushWriteBehind() # Drive exports what's on Google Sheets, so queued writes must be sent first.
+        request = DRIVE_SERVICE.files().export_media(fileId=self._spreadsheetId, mimeType=mimeType)
+        request.http = _getHttp() or request.http # MediaIoBaseDownload always uses the request's own Http object.
+        downloader = MediaIoBaseDownload(fileObj, request, chunksize=chunkSize)
+        done = False
+        while not done:
+            status, done = downloader.next_chunk(num_retries=DEFAULT_DOWNLOAD_NUM_RETRIES) # Drive requests don't count against the Sheets quota.
+            if progressCallback is not None:
+                progressCallback(status.progress())
+
+
+    def exportArrow(self, dirname, header=True, rowGroupSize=DEFAULT_EXPORT_ROW_GROUP_SIZE):
+        """
+        Writes every sheet in this spreadsheet to its own Arrow IPC file in the
+        `dirname` folder, named after the sheet's title. Requires pyarrow.
+
+        :returns: list of str - the filenames that were written, in sheet order.
+        """
+        return self._exportSheets(dirname, '.arrow', 'exportArrow', header, rowGroupSize)
+
+
+    def exportParquet(self, dirname, header=True, rowGroupSize=DEFAULT_EXPORT_ROW_GROUP_SIZE):
+        """
+        Writes every sheet in this spreadsheet to its own Parquet file in the
+        `dirname` folder, named after the sheet's title. Requires pyarrow.
+
+        :returns: list of str - the filenames that were written, in sheet order.
+        """
+        return self._exportSheets(dirname, '.parquet', 'exportParquet', header, rowGroupSize)
 
-        self.refresh()
-        self.sheets[index].resize(columnCount, rowCount)
-        return self.sheets[index]
+
+    def _exportSheets(self, dirname, extension, methodName, header, rowGroupSize):
+        _importPyarrow() # Fail before creating any folders if pyarrow isn't installed.
+        os.makedirs(dirname, exist_ok=True)
+
+        filenames = []
+        usedNames = set() # Different titles can have the same safe filename, so a numeric suffix keeps them from overwriting each other.
+        for sheet in self.sheets:
+            filename = os.path.join(dirname, _getUniqueName(_getSafeFilename(sheet.title), usedNames, caseSensitive=False) + extension)
+            getattr(sheet, methodName)(filename, header=header, rowGroupSize=rowGroupSize)
+            filenames.append(filename)
+        return filenames
 
 
 
@@ -278,11 +953,35 @@ class Sheet():
         """
         #if not IS_INITIALIZED: init() # Initialize this module if not done so already. # This line might not be needed? Sheet objects can only exist when you've already made a Spreadsheet object.
 
+        self._initAttributes(spreadsheet, sheetId)
+        self.refresh()
+
+
+    def _initAttributes(self, spreadsheet, sheetId):
         # Set the properties of this sheet
         self._spreadsheet = spreadsheet
         self._sheetId = sheetId
+        self._valueRender = spreadsheet._valueRender
+        self._dateTimeRender = spreadsheet._dateTimeRender
         self._cells = {} # To ease development, internally the local copy of the sheet data is stored in a dict with 1-based (column, row) keys.
-        self.refresh()
+        self._driveVersion = None # The Drive version of the spreadsheet when this sheet was last refreshed with skipIfUnchanged.
+        self._indexes = {} # Maps column numbers to the _ColumnIndex objects made by createIndex().
+        self._growthPolicy = DEFAULT_GROWTH_POLICY
+
+
+    @classmethod
+    def _fromSheetProperties(cls, spreadsheet, sheetPropsDict, cells=None):
+        # Creates a Sheet from a SheetProperties dict in an API response instead
+        # of requesting the properties. If `cells` is None, the sheet's data is
+        # read with one request, otherwise `cells` is used as the local data.
+        sheet = cls.__new__(cls)
+        sheet._initAttributes(spreadsheet, sheetPropsDict['sheetId'])
+        sheet._refreshPropertiesWithSheetPropertiesDict(sheetPropsDict)
+        if cells is None:
+            sheet._refreshData()
+        else:
+            sheet._replaceCells(cells)
+        return sheet
 
     # Set up the read-only attributes.
     @property
@@ -306,12 +1005,9 @@ class Sheet():
     @title.setter
     def title(self, value):
         value = str(value)
-        request = SERVICE.spreadsheets().batchUpdate(spreadsheetId=self._spreadsheet.spreadsheetId,
-        body={
-            'requests': [{'updateSheetProperties': {'properties': {'sheetId': self._sheetId,
-                                                                   'title': value},
-                                                    'fields': 'title'}}]})
-        request.execute(); _logWriteRequest()
+        self._spreadsheet._batchUpdate([{'updateSheetProperties': {'properties': {'sheetId': self._sheetId,
+                                                                                  'title': value},
+                                                                   'fields': 'title'}}])
         self._title = value
 
 
@@ -326,12 +1022,9 @@ class Sheet():
     def tabColor(self, value):
         tabColorArg = _getTabColorArg(value)
 
-        request = SERVICE.spreadsheets().batchUpdate(spreadsheetId=self._spreadsheet.spreadsheetId,
-        body={
-            'requests': [{'updateSheetProperties': {'properties': {'sheetId': self._sheetId,
-                                                                   'tabColor': tabColorArg},
-                                                    'fields': 'tabColor'}}]})
-        request.execute(); _logWriteRequest()
+        self._spreadsheet._batchUpdate([{'updateSheetProperties': {'properties': {'sheetId': self._sheetId,
+                                                                                  'tabColor': tabColorArg},
+                                                                   'fields': 'tabColor'}}])
         self._tabColor = tabColorArg
 
 
@@ -359,18 +1052,71 @@ class Sheet():
             raise IndexError('%r is out of range (0 to %d)' % (value, len(self.spreadsheet.sheets) - 1))
 
         # Update the index:
+        requestIndex = value
         if value > self._index:
-            value += 1 # Google Sheets uses "before the move" indexes, which is confusing and I don't want to do it here.
+            requestIndex += 1 # Google Sheets uses "before the move" indexes, which is confusing and I don't want to do it here.
+
+        self._spreadsheet._batchUpdate([{'updateSheetProperties': {'properties': {'sheetId': self._sheetId,
+                                                                                  'index': requestIndex},
+                                                                   'fields': 'index'}}])
+
+        # Update the spreadsheet's tuple of Sheet objects to reflect the new order:
+        sheets = [sheet for sheet in self._spreadsheet.sheets if sheet._sheetId != self._sheetId]
+        sheets.insert(value, self)
+        self._spreadsheet._setSheetsLocally(sheets)
+
+
+    @property
+    def valueRender(self):
+        """
+        Returns how cell values are read for this sheet: 'formatted' (strings
+        as displayed in the browser), 'unformatted' (ints, floats, and bools),
+        or 'formula'. Setting this re-reads the sheet's data.
+        """
+        return self._valueRender
+
+
+    @valueRender.setter
+    def valueRender(self, value):
+        _checkRenderArgs(value, self._dateTimeRender)
+        self._valueRender = value
+        self._refreshData()
+
+
+    @property
+    def dateTimeRender(self):
+        """
+        Returns how dates are read for this sheet when valueRender isn't
+        'formatted': 'serial' or 'formatted'. Setting this re-reads the sheet's data.
+        """
+        return self._dateTimeRender
+
+
+    @dateTimeRender.setter
+    def dateTimeRender(self, value):
+        _checkRenderArgs(self._valueRender, value)
+        self._dateTimeRender = value
+        self._refreshData()
+
+
+    @property
+    def growthPolicy(self):
+        """
+        Returns how many rows are added when a write needs rows past the end
+        of the sheet: 'exact' (just enough rows), 'double' (at least double
+        the rows), or an int chunk size (enough chunks of that many rows).
+        Growing by more than needed means a series of writes to the next row
+        resizes the sheet once every so often instead of before every write.
+        Growth never makes the sheet larger than MAX_CELL_COUNT cells, unless
+        the write itself needs more.
+        """
+        return self._growthPolicy
 
-        request = SERVICE.spreadsheets().batchUpdate(spreadsheetId=self._spreadsheet._spreadsheetId,
-        body={
-            'requests': [{'updateSheetProperties': {'properties': {'sheetId': self._sheetId,
-                                                                   'index': value},
-                                                    'fields': 'index'}}]})
-        request.execute(); _logWriteRequest()
 
-        self._spreadsheet.refresh() # Update the spreadsheet's tuple of Sheet objects to reflect the new order.
-        #self._index = self._spreadsheet.sheets.index(self) # Update the local Sheet object's index.
+    @growthPolicy.setter
+    def growthPolicy(self, value):
+        _checkGrowthPolicy(value)
+        self._growthPolicy = value
 
 
     def __eq__(self, other):
@@ -397,7 +1143,7 @@ class Sheet():
         if value <= self._frozenRowCount:
             raise ValueError('You cannot have all rows on the sheet frozen (sheet %r has %s frozen rows)' % (self.title, self._frozenRowCount))
 
-        self.refresh() # Retrieve up-to-date grid properties from Google Sheets.
+        self._refreshUnlessBatching() # Retrieve up-to-date grid properties from Google Sheets.
         self._rowCount = value        # Change local grid property.
         self._updateGridProperties()  # Upload grid properties to Google Sheets.
 
@@ -417,7 +1163,7 @@ class Sheet():
         if value <= self._frozenColumnCount:
             raise ValueError('You cannot have all columns on the sheet frozen (sheet %r has %s frozen columns)' % (self.title, self._frozenColumnCount))
 
-        self.refresh() # Retrieve up-to-date grid properties from Google Sheets.
+        self._refreshUnlessBatching() # Retrieve up-to-date grid properties from Google Sheets.
         self._columnCount = value     # Change local grid property.
         self._updateGridProperties()  # Upload grid properties to Google Sheets.
 
@@ -437,7 +1183,7 @@ class Sheet():
         if value >= self._rowCount:
             raise ValueError('You cannot freeze all rows on the sheet (sheet %r has %s rows)' % (self.title, self._rowCount))
 
-        self.refresh() # Retrieve up-to-date grid properties from Google Sheets.
+        self._refreshUnlessBatching() # Retrieve up-to-date grid properties from Google Sheets.
         self._frozenRowCount = value  # Change local grid property.
         self._updateGridProperties()  # Upload grid properties to Google Sheets.
 
@@ -457,7 +1203,7 @@ class Sheet():
         if value >= self._columnCount:
             raise ValueError('You cannot freeze all columns on the sheet (sheet %r has %s columns)' % (self.title, self._columnCount))
 
-        self.refresh() # Retrieve up-to-date grid properties from Google Sheets.
+        self._refreshUnlessBatching() # Retrieve up-to-date grid properties from Google Sheets.
         self._frozenColumnCount = value  # Change local grid property.
         self._updateGridProperties()  # Upload grid properties to Google Sheets.
 
@@ -471,7 +1217,7 @@ class Sheet():
     def hideGridlines(self, value):
         value = bool(value)
 
-        self.refresh() # Retrieve up-to-date grid properties from Google Sheets.
+        self._refreshUnlessBatching() # Retrieve up-to-date grid properties from Google Sheets.
         self._hideGridlines = value   # Change local grid property.
         self._updateGridProperties()  # Upload grid properties to Google Sheets.
 
@@ -485,7 +1231,7 @@ class Sheet():
     def rowGroupControlAfter(self, value):
         value = bool(value)
 
-        self.refresh() # Retrieve up-to-date grid properties from Google Sheets.
+        self._refreshUnlessBatching() # Retrieve up-to-date grid properties from Google Sheets.
         self._rowGroupControlAfter = value # Change local grid property.
         self._updateGridProperties()  # Upload grid properties to Google Sheets.
 
@@ -499,7 +1245,7 @@ class Sheet():
     def columnGroupControlAfter(self, value):
         value = bool(value)
 
-        self.refresh() # Retrieve up-to-date grid properties from Google Sheets.
+        self._refreshUnlessBatching() # Retrieve up-to-date grid properties from Google Sheets.
         self._columnGroupControlAfter = value # Change local grid property.
         self._updateGridProperties()  # Upload grid properties to Google Sheets.
 
@@ -581,6 +1327,65 @@ class Sheet():
         return [self.getRow(rowNum) for rowNum in range(startRow, stopRow)]
 
 
+    def getRange(self, cellRange):
+        """
+        Returns the values in a rectangular range of cells from the local sheet
+        data as a list of row lists, e.g. `sheet.getRange('B2:D3')` returns
+        `[['B2', 'C2', 'D2'], ['B3', 'C3', 'D3']]`. Open-ended ranges like
+        'A5:' or 'C:C' extend to the edge of the sheet. `sheet['B2:D3']` does
+        the same thing.
+
+        :param cellRange: An A1 notation str or a CellRange object.
+        """
+        cellRange = self._getOwnCellRange(cellRange)
+        cells = self._cells
+        columnNumbers = range(cellRange.startColumn, cellRange.endColumn + 1)
+        return [[cells.get((colNum, rowNum), '') for colNum in columnNumbers]
+                for rowNum in range(cellRange.startRow, cellRange.endRow + 1)]
+
+
+    def _getOwnCellRange(self, cellRange, bounded=True):
+        # Returns `cellRange` as a CellRange bounded by this sheet's size (or left open-ended if `bounded` is
+        # False), and checks that it isn't for a different sheet.
+        cellRange = parseRange(cellRange)
+        if cellRange.sheetTitle is not None and cellRange.sheetTitle != self._title:
+            raise ValueError('range %r is for sheet %r, not this sheet %r' % (str(cellRange), cellRange.sheetTitle, self._title))
+        if not bounded:
+            return cellRange
+        if ((cellRange.endColumn is None and cellRange.startColumn > self._columnCount) or
+            (cellRange.endRow is None and cellRange.startRow > self._rowCount)):
+            # Bounding this range would put its end before its start.
+            raise IndexError('range %r starts past the edge of sheet %r, which has %s columns and %s rows' % (str(cellRange), self._title, self._columnCount, self._rowCount))
+        return cellRange.bounded(self._columnCount, self._rowCount)
+
+
+    def __getitem__(self, key):
+        """
+        `sheet['B2']` returns the value of cell B2, and `sheet['B2:D3']` returns
+        a list of row lists. See `getRange()`.
+        """
+        if not isinstance(key, (str, CellRange)):
+            raise TypeError("key must be an A1 notation str like 'B2' or 'B2:D3', not %s" % (type(key).__name__))
+        cellRange = self._getOwnCellRange(key, bounded=False)
+        if _isSingleCellRange(cellRange):
+            return self.get(cellRange.startColumn, cellRange.startRow)
+        return self.getRange(cellRange)
+
+
+    def __setitem__(self, key, value):
+        """
+        `sheet['B2'] = 'hello'` updates cell B2, and `sheet['B2:D3'] = [[...], [...]]`
+        updates a rectangle of cells. See `updateRange()`.
+        """
+        if not isinstance(key, (str, CellRange)):
+            raise TypeError("key must be an A1 notation str like 'B2' or 'B2:D3', not %s" % (type(key).__name__))
+        cellRange = self._getOwnCellRange(key, bounded=False) # Like updateRange(), writing past the edge enlarges the sheet.
+        if _isSingleCellRange(cellRange):
+            self.update(cellRange.startColumn, cellRange.startRow, value)
+        else:
+            self.updateRange(cellRange, value)
+
+
     def __contains__(self, item):
         pass
 
@@ -618,14 +1423,61 @@ class Sheet():
         return [self.getColumn(colNum) for colNum in range(startColumn, stopColumn)]
 
 
-    def refresh(self):
+    def rowView(self, rowNum, trimmed=False):
+        """
+        Returns a RowView of row `rowNum`, which reads its values from the
+        local sheet data as they are accessed instead of copying them into a
+        new list the way `getRow()` does.
+
+        :param trimmed: If True, the view stops at the last non-blank cell in the row instead of at the columnCount.
+        """
+        if not isinstance(rowNum, int):
+            raise TypeError('rowNum indices must be integers, not %s' % (type(rowNum).__name__))
+        if rowNum < 1:
+            raise IndexError('Row %s does not exist. Google Sheets\' columns and rows are 1-based, not 0-based. Use index 1 instead of index 0 for row and column index.' % (rowNum))
+        return RowView(self, rowNum, trimmed)
+
+
+    def columnView(self, colNum, trimmed=False):
+        """
+        Returns a ColumnView of column `colNum` (an int or letters like 'B'),
+        which reads its values from the local sheet data as they are accessed
+        instead of copying them into a new list the way `getColumn()` does.
+
+        :param trimmed: If True, the view stops at the last non-blank cell in the column instead of at the rowCount.
+        """
+        if isinstance(colNum, str):
+            colNum = getColumnNumber(colNum)
+        if not isinstance(colNum, int):
+            raise TypeError('colNum indices must be integers, not %s' % (type(colNum).__name__))
+        if colNum < 1:
+            raise IndexError('Column %s does not exist. Google Sheets\' columns and rows are 1-based, not 0-based. Use index 1 instead of index 0 for row and column index.' % (colNum))
+        return ColumnView(self, colNum, trimmed)
+
+
+    def refresh(self, skipIfUnchanged=False):
+        """
+        Updates the local Sheet object with the current properties and data of
+        the sheet on Google Sheets.
+
+        :param skipIfUnchanged: If True, first check the spreadsheet's version on Google Drive and return without reading anything if it hasn't changed since this sheet was last refreshed with skipIfUnchanged. See `Spreadsheet.refresh()`.
+        """
+        if skipIfUnchanged:
+            driveVersion = self._spreadsheet._getDriveVersion()
+            if driveVersion == self._driveVersion:
+                return # Nothing has changed since the last refresh.
+        else:
+            driveVersion = None
+
         self._refreshProperties()
         self._refreshData()
+        self._driveVersion = driveVersion
 
 
     def _refreshProperties(self):
         # Get all the sheet properties:
-        response = SERVICE.spreadsheets().get(spreadsheetId=self._spreadsheet._spreadsheetId).execute(); _logReadRequests()
+        _acquireReadQuota()
+        response = SERVICE.spreadsheets().get(spreadsheetId=self._spreadsheet._spreadsheetId).execute(http=_getHttp())
 
         for sheetDict in response['sheets']:
             if sheetDict['properties']['sheetId'] == self._sheetId: # Find this sheet in the returned spreadsheet json data.
@@ -653,21 +1505,120 @@ class Sheet():
 
 
     def _refreshData(self):
+        self._spreadsheet._flushWriteBehind()
+
         # Get all the sheet data:
+        _acquireReadQuota()
         response = SERVICE.spreadsheets().values().get(
             spreadsheetId=self._spreadsheet._spreadsheetId,
-            range='%s!A1:%s%s' % (self._title, getColumnLetterOf(self._columnCount), self._rowCount)).execute(); _logReadRequests()
+            range=_formatA1Range(self._title, 1, 1, self._columnCount, self._rowCount),
+            valueRenderOption=VALUE_RENDER_OPTIONS[self._valueRender],
+            dateTimeRenderOption=DATE_TIME_RENDER_OPTIONS[self._dateTimeRender]).execute(http=_getHttp())
+
+        self._setCellsFromValueRange(response)
 
-        sheetData = response.get('values', [[]])
-        self._cells = {}
-        if response['majorDimension'] == 'ROWS':
+
+    def _setCellsFromValueRange(self, valueRange):
+        # Replaces the local data with the data in a ValueRange dict from a values().get or values().batchGet response.
+        sheetData = valueRange.get('values', [[]])
+        cells = {}
+        if valueRange.get('majorDimension', 'ROWS') == 'ROWS':
             for rowNumBase0, row in enumerate(sheetData):
                 for colNumBase0, sheetDatum in enumerate(row):
-                    self._cells[(colNumBase0 + 1, rowNumBase0 + 1)] = sheetDatum
-        elif response['majorDimension'] == 'COLUMNS':
+                    cells[(colNumBase0 + 1, rowNumBase0 + 1)] = sheetDatum
+        elif valueRange['majorDimension'] == 'COLUMNS':
             for colNumBase0, column in enumerate(sheetData):
                 for rowNumBase0, sheetDatum in enumerate(column):
-                    self._cells[(colNumBase0 + 1, rowNumBase0 + 1)] = sheetDatum
+                    cells[(colNumBase0 + 1, rowNumBase0 + 1)] = sheetDatum
+        self._replaceCells(cells)
+
+
+    def _storeRows(self, startColumn, startRow, rows):
+        # Stores a block of row lists in the local data, keeping any column indexes up to date.
+        cells = self._cells
+        indexes = self._indexes
+        for rowNum, row in enumerate(rows, startRow):
+            for colNum, value in enumerate(row, startColumn):
+                if indexes and colNum in indexes:
+                    indexes[colNum].replace(rowNum, cells.get((colNum, rowNum), ''), value)
+                cells[(colNum, rowNum)] = value
+
+
+    def _storeColumns(self, startColumn, startRow, columns):
+        # Stores a block of column lists in the local data, keeping any column indexes up to date.
+        cells = self._cells
+        indexes = self._indexes
+        for colNum, column in enumerate(columns, startColumn):
+            index = indexes.get(colNum)
+            for rowNum, value in enumerate(column, startRow):
+                if index is not None:
+                    index.replace(rowNum, cells.get((colNum, rowNum), ''), value)
+                cells[(colNum, rowNum)] = value
+
+
+    def _replaceCells(self, cells):
+        # Replaces the local data with the `cells` dict, rebuilding the column indexes from it first. Both are
+        # swapped in with one assignment, so a thread reading the sheet (such as a SheetWatcher) never sees a
+        # half-filled cache or indexes that don't match it.
+        indexes = dict((colNum, _ColumnIndex(cells, colNum)) for colNum in self._indexes)
+        self._cells, self._indexes = cells, indexes
+
+
+    def createIndex(self, column):
+        """
+        Builds a hash index of the values in `column` (an int or letters like
+        'A') so that `lookup()` can find rows without scanning the column.
+        The index is kept up to date by this Sheet object's update*(), clear(),
+        and refresh() methods, but not by changes made on Google Sheets until
+        the sheet is refreshed.
+        """
+        colNum = self._getIndexColumnNumber(column)
+        self._indexes[colNum] = _ColumnIndex(self._cells, colNum)
+
+
+    def dropIndex(self, column):
+        """Removes the index created by `createIndex()` for `column`."""
+        colNum = self._getIndexColumnNumber(column)
+        if colNum not in self._indexes:
+            raise KeyError('column %s has no index' % (getColumnLetterOf(colNum)))
+        del self._indexes[colNum]
+
+
+    def lookup(self, column, value):
+        """
+        Returns the row number of the first row whose cell in `column` equals
+        `value`, or None if there is no such row. If `column` has an index (see
+        `createIndex()`), this doesn't scan the column.
+        """
+        rowNums = self.lookupAll(column, value)
+        return rowNums[0] if rowNums else None
+
+
+    def lookupAll(self, column, value):
+        """
+        Returns a sorted list of the row numbers of every row whose cell in
+        `column` equals `value`. See `lookup()`.
+        """
+        colNum = self._getIndexColumnNumber(column)
+        if colNum in self._indexes:
+            return sorted(self._indexes[colNum].get(value))
+        return [rowNum for rowNum, cellValue in enumerate(self.columnView(colNum), 1) if cellValue == value]
+
+
+    def _getIndexColumnNumber(self, column):
+        if isinstance(column, str):
+            column = getColumnNumber(column)
+        if not isinstance(column, int):
+            raise TypeError('column indices must be integers or letters, not %s' % (type(column).__name__))
+        if column < 1:
+            raise IndexError('Column %s does not exist. Google Sheets\' columns and rows are 1-based, not 0-based. Use index 1 instead of index 0 for row and column index.' % (column))
+        return column
+
+
+    def _refreshUnlessBatching(self):
+        # Refreshes this sheet, unless a structuralBatch() is active, in which case the local properties are used as they are.
+        if self._spreadsheet._batchRequests is None:
+            self.refresh()
 
 
     def _updateGridProperties(self):
@@ -678,24 +1629,32 @@ class Sheet():
                           'hideGridlines':           self._hideGridlines,
                           'rowGroupControlAfter':    self._rowGroupControlAfter,
                           'columnGroupControlAfter': self._columnGroupControlAfter}
-        request = SERVICE.spreadsheets().batchUpdate(spreadsheetId=self._spreadsheet._spreadsheetId,
-            body={
-            'requests': [{'updateSheetProperties': {'properties': {'sheetId': self._sheetId,
-                                                                   'gridProperties': gridProperties},
-                                                    'fields': 'gridProperties'}}]})
-        request.execute(); _logWriteRequest()
+        self._spreadsheet._batchUpdate([{'updateSheetProperties': {'properties': {'sheetId': self._sheetId,
+                                                                                  'gridProperties': gridProperties},
+                                                                   'fields': 'gridProperties'}}])
 
 
     def _enlargeIfNeeded(self, requestedColumn=None, requestedRow=None):
-        # Increase rowCount or columnCount if needed.
+        # Increase rowCount or columnCount if needed. Rows are added according to the growthPolicy.
         if requestedColumn is None:
             requestedColumn = self._columnCount
         if requestedRow is None:
             requestedRow = self._rowCount
-
-        # Enlarge the sheet:
-        self.resize(max(requestedColumn, self._columnCount),
-                    max(requestedRow, self._rowCount))
+        if requestedColumn <= self._columnCount and requestedRow <= self._rowCount:
+            return # The sheet is already large enough.
+
+        # Enlarge the sheet, keeping the grown size within the cells left over by the other sheets:
+        columnCount = max(requestedColumn, self._columnCount)
+        exactRowCount = max(requestedRow, self._rowCount)
+        otherCellCount = sum(sheet._rowCount * sheet._columnCount for sheet in self._spreadsheet.sheets if sheet is not self)
+        grownRowCount = _getGrownRowCount(self._rowCount, requestedRow, columnCount, self._growthPolicy, otherCellCount)
+        if grownRowCount == exactRowCount:
+            self.resize(columnCount, exactRowCount)
+            return
+        try:
+            self.resize(columnCount, grownRowCount)
+        except HttpError:
+            self.resize(columnCount, exactRowCount) # The extra rows were rejected, so add only the rows that are needed.
 
 
     def update(self, *args):
@@ -718,20 +1677,11 @@ class Sheet():
 
         self._enlargeIfNeeded(column, row)
 
-        cellLocation = getColumnLetterOf(column) + str(row)
-        request = SERVICE.spreadsheets().values().update(
-            spreadsheetId=self._spreadsheet._spreadsheetId,
-            range='%s!%s:%s' % (self._title, cellLocation, cellLocation),
-            valueInputOption='USER_ENTERED', # Details at https://developers.google.com/sheets/api/reference/rest/v4/ValueInputOption
-            body={
-                'majorDimension': 'ROWS',
-                'values': [[value]],
-                #'range': '%s!%s:%s' % (self._title, cellLocation, cellLocation),
-                }
-            )
-        request.execute(); _logWriteRequest()
+        self._spreadsheet._updateValues([{'range': _formatA1Range(self._title, column, row, column, row),
+                                           'majorDimension': 'ROWS',
+                                           'values': [[value]]}])
 
-        self._cells[(column, row)] = value
+        self._storeRows(column, row, [[value]])
 
 
 
@@ -750,21 +1700,12 @@ class Sheet():
 
         self._enlargeIfNeeded(None, row)
 
-        request = SERVICE.spreadsheets().values().update(
-            spreadsheetId=self._spreadsheet._spreadsheetId,
-            range='%s!A%s:%s%s' % (self._title, row, getColumnLetterOf(len(values)), row),
-            valueInputOption='USER_ENTERED', # Details at https://developers.google.com/sheets/api/reference/rest/v4/ValueInputOption
-            body={
-                'majorDimension': 'ROWS',
-                'values': [values],
-                #'range': '%s!A%s:%s%s' % (self._title, row, getColumnLetterOf(len(values)), row),
-                }
-            )
-        request.execute(); _logWriteRequest()
+        self._spreadsheet._updateValues([{'range': _formatA1Range(self._title, 1, row, len(values), row),
+                                           'majorDimension': 'ROWS',
+                                           'values': [values]}])
 
         # Update the local data in `_cells`:
-        for colNumBase1 in range(1, self._columnCount+1):
-            self._cells[(colNumBase1, row)] = values[colNumBase1-1]
+        self._storeRows(1, row, [values])
 
 
     def updateColumn(self, column, values):
@@ -787,21 +1728,12 @@ class Sheet():
 
         self._enlargeIfNeeded(column, None)
 
-        request = SERVICE.spreadsheets().values().update(
-            spreadsheetId=self._spreadsheet._spreadsheetId,
-            range='%s!%s1:%s%s' % (self._title, getColumnLetterOf(column), getColumnLetterOf(column), len(values)),
-            valueInputOption='USER_ENTERED', # Details at https://developers.google.com/sheets/api/reference/rest/v4/ValueInputOption
-            body={
-                'majorDimension': 'COLUMNS',
-                'values': [values],
-                #'range': '%s!%s1:%s%s' % (self._title, getColumnLetterOf(column), getColumnLetterOf(column), len(values)),
-                }
-            )
-        request.execute(); _logWriteRequest()
+        self._spreadsheet._updateValues([{'range': _formatA1Range(self._title, column, 1, column, len(values)),
+                                           'majorDimension': 'COLUMNS',
+                                           'values': [values]}])
 
         # Update the local data in `_cells`:
-        for rowNumBase1 in range(1, self._rowCount+1):
-            self._cells[(column, rowNumBase1)] = values[rowNumBase1-1]
+        self._storeColumns(column, 1, [values])
 
 
     def updateRows(self, rows, startRow=1):
@@ -836,22 +1768,12 @@ class Sheet():
 
         # Send the API request that updates the Google sheet.
         #rangeCells = '%s!A%s:%s%s' % (self._title, startRow, getColumnLetterOf(maxColumnCount), stopRow - 1)
-        request = SERVICE.spreadsheets().values().update(
-            spreadsheetId=self._spreadsheet._spreadsheetId,
-            range='%s!A%s:%s%s' % (self._title, startRow, getColumnLetterOf(maxColumnCount), startRow + len(rows) - 1),
-            valueInputOption='USER_ENTERED', # Details at https://developers.google.com/sheets/api/reference/rest/v4/ValueInputOption
-            body={
-                'majorDimension': 'ROWS',
-                'values': rows,
-                #'range': rangeCells,
-                }
-            )
-        request.execute(); _logWriteRequest()
+        self._spreadsheet._updateValues([{'range': _formatA1Range(self._title, 1, startRow, maxColumnCount, startRow + len(rows) - 1),
+                                           'majorDimension': 'ROWS',
+                                           'values': rows}])
 
         # Update the local data in `_cells`:
-        for rowNumBase1 in range(startRow, startRow + len(rows)):
-            for colNumBase0 in range(maxColumnCount):
-                self._cells[(colNumBase0+1, rowNumBase1)] = rows[rowNumBase1-startRow][colNumBase0]
+        self._storeRows(1, startRow, rows)
 
     def updateColumns(self, columns, startColumn=1):
         # Argument validation:
@@ -885,22 +1807,12 @@ class Sheet():
 
         # Send the API request that updates the Google sheet.
         #rangeCells = '%s!A%s:%s%s' % (self._title, startRow, getColumnLetterOf(maxColumnCount), stopRow - 1)
-        request = SERVICE.spreadsheets().values().update(
-            spreadsheetId=self._spreadsheet._spreadsheetId,
-            range='%s!%s1:%s%s' % (self._title, getColumnLetterOf(startColumn), getColumnLetterOf(startColumn + len(columns) - 1), maxRowCount),
-            valueInputOption='USER_ENTERED', # Details at https://developers.google.com/sheets/api/reference/rest/v4/ValueInputOption
-            body={
-                'majorDimension': 'COLUMNS',
-                'values': columns,
-                #'range': rangeCells,
-                }
-            )
-        request.execute(); _logWriteRequest()
+        self._spreadsheet._updateValues([{'range': _formatA1Range(self._title, startColumn, 1, startColumn + len(columns) - 1, maxRowCount),
+                                           'majorDimension': 'COLUMNS',
+                                           'values': columns}])
 
         # Update the local data in `_cells`:
-        for colNumBase1 in range(startColumn, startColumn + len(columns)):
-            for rowNumBase0 in range(maxRowCount):
-                self._cells[(colNumBase1, rowNumBase0+1)] = columns[colNumBase1-startColumn][rowNumBase0]
+        self._storeColumns(startColumn, 1, columns)
 
     """
     def updateColumns(self, columns, startColumn=0, stopColumn=None, step=1):
@@ -934,7 +1846,8 @@ class Sheet():
                 #'range': rangeCells,
                 }
             )
-        request.execute(); _logWriteRequest()
+        _acquireWriteQuota()
+        request.execute(http=_getHttp())
 
         # Update the local data in `_cells`:
         for colNumBase0 in range(len(columns)):
@@ -942,39 +1855,600 @@ class Sheet():
                 self._cells[(colNumBase0+1, rowNumBase0+1)] = columns[colNumBase0][rowNumBase0]
     """
 
-    def clear(self):
-        request = SERVICE.spreadsheets().values().update(
+    def updateRange(self, cellRange, rows):
+        """
+        Writes `rows`, a list of row lists, to a rectangle of cells whose
+        top-left cell is the start of `cellRange`, in one request. Short rows
+        are padded with blank cells so the whole rectangle is written, but
+        nothing outside of it is changed. If `cellRange` has an end, like
+        'B2:D3', `rows` must fit inside it. `sheet['B2:D3'] = rows` does the
+        same thing.
+
+        :param cellRange: An A1 notation str or a CellRange object, like 'B2' or 'B2:D3'.
+        """
+        cellRange = parseRange(cellRange)
+        if cellRange.sheetTitle is not None and cellRange.sheetTitle != self._title:
+            raise ValueError('range %r is for sheet %r, not this sheet %r' % (str(cellRange), cellRange.sheetTitle, self._title))
+        if not isinstance(rows, (list, tuple)):
+            raise TypeError('rows arg must be a list/tuple of lists/tuples, not %s' % (type(rows).__name__))
+        for row in rows:
+            if not isinstance(row, (list, tuple)):
+                raise TypeError('rows arg contains a non-list/tuple')
+
+        width = max([len(row) for row in rows] + [0])
+        height = len(rows)
+        if width == 0:
+            return # No cells to update, so return.
+
+        startColumn, startRow = cellRange.startColumn, cellRange.startRow
+        endColumn, endRow = startColumn + width - 1, startRow + height - 1
+        isSingleCell = cellRange.endColumn == startColumn and cellRange.endRow == startRow
+        if not isSingleCell:
+            # An end column or row of the range limits how large `rows` can be:
+            if cellRange.endColumn is not None and endColumn > cellRange.endColumn:
+                raise ValueError('rows arg is %s columns wide, which does not fit in range %r' % (width, str(cellRange)))
+            if cellRange.endRow is not None and endRow > cellRange.endRow:
+                raise ValueError('rows arg is %s rows tall, which does not fit in range %r' % (height, str(cellRange)))
+
+        rows = [list(row) + [''] * (width - len(row)) for row in rows]
+
+        self._enlargeIfNeeded(endColumn, endRow)
+
+        self._spreadsheet._updateValues([{'range': _formatA1Range(self._title, startColumn, startRow, endColumn, endRow),
+                                           'majorDimension': 'ROWS',
+                                           'values': rows}])
+
+        # Update only the written rectangle of the local data in `_cells`:
+        self._storeRows(startColumn, startRow, rows)
+
+
+    def load(self, source, startCell='A1', chunkRows=DEFAULT_LOAD_CHUNK_ROWS, workers=1, rowCount=None, updateCache=True):
+        """
+        Writes rows from `source` to the sheet a chunk at a time, so that a
+        large dataset never has to be in memory all at once. `source` can be
+        the filename of a .csv or .tsv file, or any iterable of row lists,
+        like a generator or a csv.reader object.
+
+        If the number of rows is known (from `rowCount`, or from `len()` of a
+        list or tuple `source`), the sheet is resized once before any data is
+        sent. Otherwise it's enlarged as chunks need more rows.
+
+        :param startCell: The top-left cell to write the rows to.
+        :param chunkRows: The most rows sent in one request.
+        :param workers: The number of chunks uploaded in parallel. All of them share the module's quota throttling.
+        :param rowCount: The number of rows in `source`, if it's known but `source` has no length.
+        :param updateCache: If False, the local data isn't updated, which saves memory; call refresh() to read the loaded data.
+        :returns: int - the number of rows written.
+        """
+        startColumn, startRow = convertToColumnRowInts(startCell)
+        for argName, value in (('chunkRows', chunkRows), ('workers', workers)):
+            if not isinstance(value, int):
+                raise TypeError('%s arg must be an int, not %s' % (argName, type(value).__name__))
+            if value < 1:
+                raise ValueError('%s arg must be at least 1, not %r' % (argName, value))
+        if rowCount is not None and not isinstance(rowCount, int):
+            raise TypeError('rowCount arg must be an int, not %s' % (type(rowCount).__name__))
+
+        if isinstance(source, str):
+            delimiter = '\t' if source.lower().endswith('.tsv') else ','
+            with open(source, newline='', encoding='utf-8') as fileObj:
+                return self._loadRows(csv.reader(fileObj, delimiter=delimiter), startColumn, startRow, chunkRows, workers, rowCount, updateCache)
+        if rowCount is None and isinstance(source, (list, tuple)):
+            rowCount = len(source)
+        return self._loadRows(iter(source), startColumn, startRow, chunkRows, workers, rowCount, updateCache)
+
+
+    def _loadRows(self, rowIterator, startColumn, startRow, chunkRows, workers, rowCount, updateCache):
+        self._spreadsheet._flushWriteBehind() # Queued writes must not land after the loaded rows.
+
+        executor = concurrent.futures.ThreadPoolExecutor(workers) if workers > 1 else None
+        uploads = collections.deque() # (future, chunkStartRow, chunk) tuples of the chunks being uploaded.
+        loadedRowCount = 0
+        try:
+            while True:
+                chunk = [list(row) for row in itertools.islice(rowIterator, chunkRows)]
+                if not chunk:
+                    break
+                chunkStartRow = startRow + loadedRowCount
+                chunkEndColumn = startColumn + max([len(row) for row in chunk] + [1]) - 1
+                if loadedRowCount == 0 and rowCount is not None:
+                    self._enlargeIfNeeded(chunkEndColumn, startRow + max(rowCount, len(chunk)) - 1) # Size the sheet once, up front.
+                else:
+                    self._enlargeIfNeeded(chunkEndColumn, chunkStartRow + len(chunk) - 1)
+                loadedRowCount += len(chunk)
+
+                if executor is None:
+                    self._writeChunk(startColumn, chunkStartRow, chunk)
+                    if updateCache:
+                        self._storeRows(startColumn, chunkStartRow, chunk)
+                    continue
+
+                uploads.append((executor.submit(self._writeChunk, startColumn, chunkStartRow, chunk), chunkStartRow, chunk))
+                # Only keep a couple of chunks per worker in memory:
+                while len(uploads) >= workers * 2:
+                    self._finishUpload(uploads.popleft(), startColumn, updateCache)
+            while uploads:
+                self._finishUpload(uploads.popleft(), startColumn, updateCache)
+        finally:
+            for future, chunkStartRow, chunk in uploads:
+                future.cancel() # An upload failed, so don't start the rest.
+            if executor is not None:
+                executor.shutdown(wait=True)
+        return loadedRowCount
+
+
+    def _finishUpload(self, upload, startColumn, updateCache):
+        future, chunkStartRow, chunk = upload
+        future.result() # Raises the upload's exception, if it had one.
+        if updateCache:
+            self._storeRows(startColumn, chunkStartRow, chunk)
+
+
+    def _writeChunk(self, startColumn, startRow, rows):
+        # Writes rows directly (never through the write-behind queue), from whichever thread calls this.
+        # load() already uploads chunks in parallel, so an oversized chunk's bands are sent one at a time.
+        self._spreadsheet._sendValueRanges([{'range': _formatA1Range(self._title, startColumn, startRow,
+                                                                     startColumn + max([len(row) for row in rows] + [1]) - 1, startRow + len(rows) - 1),
+                                             'majorDimension': 'ROWS',
+                                             'values': rows}], workers=1)
+
+
+    def appendRows(self, rows, chunkRows=DEFAULT_APPEND_CHUNK_ROWS):
+        """
+        Adds `rows`, a list of row lists, after the last row of data in the
+        sheet with values().append requests. Google Sheets inserts new rows
+        for them in the same request, so the sheet never needs a separate
+        resize, and the last row of data doesn't have to be known. The local
+        data and `rowCount` are updated from the ranges in the responses.
+
+        :param chunkRows: The most rows sent in one request. Chunks are also split so that no request is over MAX_REQUEST_BYTES.
+        :returns: int - the row number of the first appended row, or None if `rows` is empty.
+        """
+        if not isinstance(rows, (list, tuple)):
+            raise TypeError('rows arg must be a list/tuple of lists/tuples, not %s' % (type(rows).__name__))
+        for row in rows:
+            if not isinstance(row, (list, tuple)):
+                raise TypeError('rows arg contains a non-list/tuple')
+        if not isinstance(chunkRows, int):
+            raise TypeError('chunkRows arg must be an int, not %s' % (type(chunkRows).__name__))
+        if chunkRows < 1:
+            raise ValueError('chunkRows arg must be at least 1, not %r' % (chunkRows))
+
+        width = max([len(row) for row in rows] + [0])
+        if width == 0:
+            return None # No cells to append, so return.
+        rows = [list(row) for row in rows]
+
+        self._spreadsheet._flushWriteBehind() # Appends go after the last row of data, so earlier writes must be sent first.
+        self._enlargeIfNeeded(width, None)
+
+        # Split the rows into chunks of at most chunkRows rows and MAX_REQUEST_BYTES of estimated JSON each:
+        chunks = []
+        for chunkStart in range(0, len(rows), chunkRows):
+            chunk = rows[chunkStart:chunkStart + chunkRows]
+            bands = _splitValueRange({'range': _formatA1Range(self._title, 1, 1, width, len(chunk)), 'majorDimension': 'ROWS', 'values': chunk},
+                                     MAX_REQUEST_BYTES)
+            chunks.extend(band['values'] for band, bandBytes in bands)
+
+        firstRowNum = None
+        for chunk in chunks:
+            request = SERVICE.spreadsheets().values().append(
+                spreadsheetId=self._spreadsheet._spreadsheetId,
+                range=_formatA1Range(self._title, 1, 1, width, None),
+                valueInputOption='USER_ENTERED', # Details at https://developers.google.com/sheets/api/reference/rest/v4/ValueInputOption
+                insertDataOption='INSERT_ROWS',
+                body={
+                    'majorDimension': 'ROWS',
+                    'values': chunk,
+                    }
+                )
+            _acquireWriteQuota()
+            response = request.execute(http=_getHttp())
+
+            updatedRange = parseRange(response['updates']['updatedRange'])
+            self._insertRowsLocally(updatedRange.startRow, len(chunk))
+            self._storeRows(updatedRange.startColumn, updatedRange.startRow, chunk)
+            if firstRowNum is None:
+                firstRowNum = updatedRange.startRow
+        return firstRowNum
+
+
+    def _insertRowsLocally(self, rowNum, count):
+        # Updates the local data and rowCount for `count` new blank rows inserted at `rowNum`, like Google Sheets' INSERT_ROWS does.
+        self._rowCount += count
+        cells = self._cells
+        movedCells = [(key, value) for key, value in cells.items() if key[1] >= rowNum and value != '']
+        if not movedCells:
+            return # Nothing below the new rows, which is the usual case when appending.
+
+        # Shift just the non-blank cells below the new rows, keeping any column indexes up to date. Blank
+        # cells left behind read the same as missing ones, so they don't need to be moved.
+        indexes = self._indexes
+        for (colNum, cellRowNum), value in movedCells:
+            del cells[(colNum, cellRowNum)]
+            if colNum in indexes:
+                indexes[colNum].remove(cellRowNum, value)
+        for (colNum, cellRowNum), value in movedCells:
+            cells[(colNum, cellRowNum + count)] = value
+            if colNum in indexes:
+                indexes[colNum].add(cellRowNum + count, value)
+
+
+    def upsertRows(self, records, key, headerRow=1):
+        """
+        Inserts or updates rows from `records`, a list of dicts that map
+        header names to values. A record whose `key` value matches a row's
+        cell in the `key` column updates that row; other records are added as
+        new rows after the last row with data. Only the cells whose values
+        changed are written, all in one values().batchUpdate request (plus one
+        resize if the new rows don't fit in the sheet).
+
+        >>> sheet.upsertRows([{'ID': '17', 'Status': 'closed'}, {'ID': '99', 'Status': 'open'}], key='ID')
+        UpsertResult(updatedRows=1, appendedRows=1, updatedCells=3)
+
+        :returns: UpsertResult - a namedtuple of the number of updated rows, appended rows, and written cells.
+        """
+        if not isinstance(records, (list, tuple)):
+            raise TypeError('records arg must be a list/tuple of dicts, not %s' % (type(records).__name__))
+        for record in records:
+            if not isinstance(record, dict):
+                raise TypeError('records arg contains a non-dict')
+
+        # Map the header names to column numbers:
+        colNumsByName = {}
+        for colNum, name in enumerate(self.rowView(headerRow, trimmed=True), 1):
+            if name != '':
+                colNumsByName.setdefault(name, colNum)
+        if key not in colNumsByName:
+            raise KeyError('no column named %r in header row %s' % (key, headerRow))
+        unknownNames = set(name for record in records for name in record) - set(colNumsByName)
+        if unknownNames:
+            raise KeyError('no columns named %r in header row %s' % (sorted(unknownNames, key=str), headerRow))
+        keyColNum = colNumsByName[key]
+
+        # Merge records with the same key value, so each row is written once. Key values are compared as strs, the
+        # way the formatted cells are, so {'ID': 17} matches a cell with '17'.
+        mergedRecords = collections.OrderedDict()
+        for record in records:
+            if record.get(key, '') == '':
+                raise ValueError('record %r has no value for the key column %r' % (record, key))
+            mergedRecords.setdefault(str(record[key]), {}).update(record)
+
+        # Find the first row after the header of each key value, using the column's index if it has one:
+        cells = self._cells
+        keyIndex = self._indexes.get(keyColNum)
+        if keyIndex is None:
+            keyIndex = _ColumnIndex(cells, keyColNum)
+        rowNumsByKey = {}
+        for value, rowNums in keyIndex.items():
+            keyValue = str(value)
+            rowNums = [rowNum for rowNum in rowNums if rowNum > headerRow]
+            if rowNums and keyValue in mergedRecords:
+                rowNumsByKey[keyValue] = min(rowNums + [rowNumsByKey.get(keyValue, rowNums[0])])
+
+        lastRow = max(self._getDataExtent()[1], headerRow)
+        changedRuns = [] # A list of (startColumn, rowNum, [values]) tuples for existing rows.
+        newRows = []     # A list of row lists to append after `lastRow`.
+        updatedRowCount = 0
+        for keyValue, record in mergedRecords.items():
+            rowNum = rowNumsByKey.get(keyValue)
+            if rowNum is None:
+                # Append a new row:
+                newRow = [''] * max(colNumsByName[name] for name in record)
+                for name, value in record.items():
+                    newRow[colNumsByName[name] - 1] = value
+                newRows.append(newRow)
+            else:
+                # Update the changed cells of an existing row, grouped into runs of adjacent columns:
+                changedColNums = sorted(colNumsByName[name] for name, value in record.items()
+                                        if not _cellValuesMatch(cells.get((colNumsByName[name], rowNum), ''), value))
+                valuesByColNum = dict((colNumsByName[name], value) for name, value in record.items())
+                if changedColNums:
+                    updatedRowCount += 1
+                for colNum in changedColNums:
+                    if changedRuns and changedRuns[-1][1] == rowNum and changedRuns[-1][0] + len(changedRuns[-1][2]) == colNum:
+                        changedRuns[-1][2].append(valuesByColNum[colNum])
+                    else:
+                        changedRuns.append((colNum, rowNum, [valuesByColNum[colNum]]))
+
+        data = [{'range': _formatA1Range(self._title, startColumn, rowNum, startColumn + len(values) - 1, rowNum),
+                 'majorDimension': 'ROWS',
+                 'values': [values]} for startColumn, rowNum, values in changedRuns]
+        if newRows:
+            newRowsWidth = max(len(row) for row in newRows)
+            newRows = [row + [''] * (newRowsWidth - len(row)) for row in newRows]
+            data.append({'range': _formatA1Range(self._title, 1, lastRow + 1, newRowsWidth, lastRow + len(newRows)),
+                         'majorDimension': 'ROWS',
+                         'values': newRows})
+            self._enlargeIfNeeded(newRowsWidth, lastRow + len(newRows))
+        if not data:
+            return UpsertResult(0, 0, 0) # Nothing changed, so there is nothing to write.
+
+        self._spreadsheet._updateValues(data)
+
+        # Update the local data in `_cells`:
+        for startColumn, rowNum, values in changedRuns:
+            self._storeRows(startColumn, rowNum, [values])
+        if newRows:
+            self._storeRows(1, lastRow + 1, newRows)
+        return UpsertResult(updatedRowCount, len(newRows),
+                            sum(len(values) for startColumn, rowNum, values in changedRuns) + sum(len(row) for row in newRows))
+
+
+    def sort(self, cellRange, keys):
+        """
+        Sorts the rows of `cellRange` on Google Sheets with one sortRange
+        request, then reads back just that range to update the local data.
+
+        >>> sheet.sort('A2:D100', keys=[('B', 'desc'), 'A'])
+
+        :param cellRange: An A1 notation str or a CellRange object.
+        :param keys: A list of columns (letters or ints) or (column, 'asc' or 'desc') tuples, most significant first.
+        """
+        cellRange = self._getOwnCellRange(cellRange)
+        if not isinstance(keys, (list, tuple)) or len(keys) == 0:
+            raise TypeError('keys arg must be a non-empty list of columns or (column, order) tuples')
+
+        sortSpecs = []
+        for key in keys:
+            column, order = key if isinstance(key, tuple) else (key, 'asc')
+            if order not in SORT_ORDERS:
+                raise ValueError('sort order must be one of %r, not %r' % (tuple(SORT_ORDERS), order))
+            colNum = self._getIndexColumnNumber(column)
+            if not (cellRange.startColumn <= colNum <= cellRange.endColumn):
+                raise ValueError('column %s is not in range %r' % (getColumnLetterOf(colNum), str(cellRange)))
+            sortSpecs.append({'dimensionIndex': colNum - 1, 'sortOrder': SORT_ORDERS[order]})
+
+        self._spreadsheet._flushWriteBehind() # Queued cell writes must reach Google Sheets before this operation changes or reads them.
+        request = SERVICE.spreadsheets().batchUpdate(spreadsheetId=self._spreadsheet._spreadsheetId,
+        body={
+            'requests': [{'sortRange': {'range': cellRange.toGridRange(self._sheetId),
+                                        'sortSpecs': sortSpecs}}]})
+        _acquireWriteQuota()
+        request.execute(http=_getHttp())
+
+        self._refreshRange(cellRange)
+
+
+    def deleteDuplicates(self, cellRange, columns=None):
+        """
+        Removes the rows of `cellRange` that duplicate an earlier row on
+        Google Sheets with one deleteDuplicates request. If any rows were
+        removed, just that range is read back to update the local data.
+
+        :param cellRange: An A1 notation str or a CellRange object.
+        :param columns: A list of columns (letters or ints) to compare rows by. Defaults to all the columns in the range.
+        :returns: int - the number of rows removed.
+        """
+        cellRange = self._getOwnCellRange(cellRange)
+        deleteDuplicatesArgs = {'range': cellRange.toGridRange(self._sheetId)}
+        if columns is not None:
+            if not isinstance(columns, (list, tuple)):
+                raise TypeError('columns arg must be a list of columns, not %s' % (type(columns).__name__))
+            comparisonColumns = []
+            for column in columns:
+                colNum = self._getIndexColumnNumber(column)
+                if not (cellRange.startColumn <= colNum <= cellRange.endColumn):
+                    raise ValueError('column %s is not in range %r' % (getColumnLetterOf(colNum), str(cellRange)))
+                comparisonColumns.append({'sheetId': self._sheetId, 'dimension': 'COLUMNS',
+                                          'startIndex': colNum - 1, 'endIndex': colNum})
+            deleteDuplicatesArgs['comparisonColumns'] = comparisonColumns
+
+        self._spreadsheet._flushWriteBehind() # Queued cell writes must reach Google Sheets before this operation changes or reads them.
+        request = SERVICE.spreadsheets().batchUpdate(spreadsheetId=self._spreadsheet._spreadsheetId,
+        body={
+            'requests': [{'deleteDuplicates': deleteDuplicatesArgs}]})
+        _acquireWriteQuota()
+        response = request.execute(http=_getHttp())
+
+        removedCount = response['replies'][0].get('deleteDuplicates', {}).get('duplicatesRemovedCount', 0)
+        if removedCount > 0:
+            self._refreshRange(cellRange)
+        return removedCount
+
+
+    def trimWhitespace(self, cellRange):
+        """
+        Removes the whitespace at the start and end of every cell in
+        `cellRange` and reduces other runs of whitespace to a single space,
+        on Google Sheets with one trimWhitespace request. The local data is
+        trimmed the same way instead of being read back.
+
+        :param cellRange: An A1 notation str or a CellRange object.
+        :returns: int - the number of cells changed.
+        """
+        cellRange = self._getOwnCellRange(cellRange)
+        self._spreadsheet._flushWriteBehind() # Queued cell writes must reach Google Sheets before this operation changes or reads them.
+        request = SERVICE.spreadsheets().batchUpdate(spreadsheetId=self._spreadsheet._spreadsheetId,
+        body={
+            'requests': [{'trimWhitespace': {'range': cellRange.toGridRange(self._sheetId)}}]})
+        _acquireWriteQuota()
+        response = request.execute(http=_getHttp())
+
+        changedCount = response['replies'][0].get('trimWhitespace', {}).get('cellsChangedCount', 0)
+        if changedCount > 0:
+            rows = self.getRange(cellRange)
+            for row in rows:
+                for i, value in enumerate(row):
+                    if isinstance(value, str):
+                        row[i] = _WHITESPACE_PATTERN.sub(' ', value.strip())
+            self._storeRows(cellRange.startColumn, cellRange.startRow, rows)
+        return changedCount
+
+
+    def _refreshRange(self, cellRange):
+        # Reads one bounded CellRange of this sheet and updates just that part of the local data.
+        self._spreadsheet._flushWriteBehind()
+        _acquireReadQuota()
+        response = SERVICE.spreadsheets().values().get(
             spreadsheetId=self._spreadsheet._spreadsheetId,
-            range='%s!A1:%s%s' % (self._title, getColumnLetterOf(self._columnCount), self._rowCount),
-            valueInputOption='USER_ENTERED', # Details at https://developers.google.com/sheets/api/reference/rest/v4/ValueInputOption
-            body={
-                'majorDimension': 'ROWS',
-                'values': [[''] * self._columnCount for i in range(self._rowCount)],
-                #'range': rangeCells,
-                }
-            )
-        request.execute(); _logWriteRequest()
+            range=_formatA1Range(self._title, cellRange.startColumn, cellRange.startRow, cellRange.endColumn, cellRange.endRow),
+            majorDimension='ROWS',
+            valueRenderOption=VALUE_RENDER_OPTIONS[self._valueRender],
+            dateTimeRenderOption=DATE_TIME_RENDER_OPTIONS[self._dateTimeRender]).execute(http=_getHttp())
+
+        # The response leaves out trailing blank rows and cells, so pad it to the size of the range:
+        width = cellRange.endColumn - cellRange.startColumn + 1
+        height = cellRange.endRow - cellRange.startRow + 1
+        rows = [row + [''] * (width - len(row)) for row in response.get('values', [])]
+        rows.extend([[''] * width for i in range(height - len(rows))])
+        # Replace just the cells in the range, updating only the indexes of its columns, so this costs the size of
+        # the range rather than the size of the sheet:
+        self._storeRows(cellRange.startColumn, cellRange.startRow, rows)
+
+
+    def clear(self):
+        self._spreadsheet._updateValues([{'range': _formatA1Range(self._title, 1, 1, self._columnCount, self._rowCount),
+                                           'majorDimension': 'ROWS',
+                                           'values': [[''] * self._columnCount for i in range(self._rowCount)]}])
 
         # Update the local data in `_cells`:
-        self._cells = {}
+        self._replaceCells({})
+
+
+    def query(self, headerRow=1):
+        """
+        Returns a Query object for filtering and projecting the local sheet
+        data without making any requests, using the values in `headerRow` as
+        the column names:
+
+        >>> sheet.query().where('Status', '==', 'open').select('ID', 'Owner').limit(100).rows()
+        [['17', 'Alice'], ['23', 'Bob']]
+        """
+        return Query(self, headerRow)
+
+
+    def watch(self, callback, minInterval=DEFAULT_WATCH_MIN_INTERVAL, maxInterval=DEFAULT_WATCH_MAX_INTERVAL, onError=None):
+        """
+        Starts polling this sheet for changes in a background thread and
+        returns the SheetWatcher object, which has a `stop()` method. Each
+        poll checks the spreadsheet's Drive version first, and only reads the
+        sheet if the version changed. When cells have changed, the local data
+        is updated and `callback(sheet, changes)` is called (from the
+        background thread) with a list of CellChange namedtuples.
+
+        Polls start `minInterval` seconds apart, and the interval doubles
+        after each poll that finds no changes, up to `maxInterval` seconds.
+
+        :param onError: If given, called with the exception when a poll or `callback` raises one, and the watcher keeps polling. Otherwise the exception stops the watcher.
+        """
+        watcher = SheetWatcher(self, callback, minInterval, maxInterval, onError)
+        watcher.start()
+        return watcher
+
+
+    def format(self):
+        """
+        Returns a SheetFormatter object that collects formatting operations
+        and sends them all in one batchUpdate request at the end of a `with`
+        statement (or when its `apply()` method is called):
+
+        >>> with sheet.format() as f:
+        ...     f.bold('A1:Z1')
+        ...     f.numberFormat('C:C', '0.00')
+        ...     f.background('A2:A', 'light gray')
+        ...     f.columnWidth('A', 200)
+        """
+        return SheetFormatter(self)
 
 
     def copyTo(self, destinationSpreadsheetId):
+        """
+        Copies this sheet to the end of another spreadsheet (or this one). If
+        `destinationSpreadsheetId` is a Spreadsheet object (or this
+        spreadsheet's ID), the new sheet is added to its `sheets` without
+        refreshing it and the new Sheet object is returned; for the ID or URL
+        of another spreadsheet, only the new sheet's ID is returned, so the
+        destination spreadsheet doesn't have to be read.
+
+        :param destinationSpreadsheetId: A Spreadsheet object, or the ID or URL of a spreadsheet.
+        :returns: Sheet or int - the new sheet, or its sheet ID.
+        """
+        destinationSpreadsheet = None
+        if isinstance(destinationSpreadsheetId, Spreadsheet):
+            destinationSpreadsheet = destinationSpreadsheetId
+            destinationSpreadsheetId = destinationSpreadsheet.spreadsheetId
+        else:
+            destinationSpreadsheetId = getIdFromUrl(destinationSpreadsheetId)
+            if destinationSpreadsheetId == self._spreadsheet._spreadsheetId:
+                destinationSpreadsheet = self._spreadsheet
+
+        self._spreadsheet._flushWriteBehind() # The copy is made from what's on Google Sheets, so queued writes must be sent first.
         request = SERVICE.spreadsheets().sheets().copyTo(spreadsheetId=self._spreadsheet._spreadsheetId,
                                                          sheetId=self._sheetId,
                                                          body={'destinationSpreadsheetId': destinationSpreadsheetId})
-        request.execute(); _logWriteRequest()
+        _acquireWriteQuota()
+        response = request.execute(http=_getHttp())
+
+        if destinationSpreadsheet is None:
+            return response['sheetId']
+
+        newSheet = Sheet._fromSheetProperties(destinationSpreadsheet, response, self._copyCellsFor(destinationSpreadsheet))
+        destinationSpreadsheet._insertSheetLocally(newSheet)
+        return newSheet
+
+
+    def _copyCellsFor(self, spreadsheet):
+        # Returns a copy of the local data for a duplicate of this sheet in
+        # `spreadsheet`, or None (meaning the data must be read) if that
+        # spreadsheet reads values in a different render mode than this sheet.
+        if (spreadsheet._valueRender, spreadsheet._dateTimeRender) != (self._valueRender, self._dateTimeRender):
+            return None
+        return dict(self._cells)
+
+
+    def copyRange(self, sourceRange, destinationSheet=None, destinationCell='A1', pasteType='normal'):
+        """
+        Copies a range of cells from this sheet to `destinationSheet` (which
+        must be in the same spreadsheet) with one copyPaste request, without
+        downloading or uploading the data. The destination rectangle is then
+        read back to update the destination sheet's local data, since pasted
+        formulas and formatted values can differ from the source's.
+
+        :param sourceRange: An A1 notation str or a CellRange object, like 'A1:C10'.
+        :param destinationSheet: The Sheet to copy to. Defaults to this sheet.
+        :param destinationCell: The top-left cell to copy to, like 'E1'.
+        :param pasteType: One of 'normal', 'values', 'format', 'noBorders', 'formula', 'dataValidation', or 'conditionalFormatting'.
+        """
+        if destinationSheet is None:
+            destinationSheet = self
+        if not isinstance(destinationSheet, Sheet):
+            raise TypeError('destinationSheet arg must be a Sheet object, not %s' % (type(destinationSheet).__name__))
+        if destinationSheet._spreadsheet.spreadsheetId != self._spreadsheet.spreadsheetId:
+            raise ValueError('destinationSheet must be in the same spreadsheet; use copyTo() to copy to other spreadsheets')
+        if pasteType not in PASTE_TYPES:
+            raise ValueError('pasteType arg must be one of %r, not %r' % (tuple(PASTE_TYPES), pasteType))
+
+        sourceRange = self._getOwnCellRange(sourceRange)
+        destinationRange = parseRange(destinationCell)
+        destinationStartColumn, destinationStartRow = destinationRange.startColumn, destinationRange.startRow
+        destinationEndColumn = destinationStartColumn + sourceRange.endColumn - sourceRange.startColumn
+        destinationEndRow = destinationStartRow + sourceRange.endRow - sourceRange.startRow
+        destinationSheet._enlargeIfNeeded(destinationEndColumn, destinationEndRow)
+
+        self._spreadsheet._flushWriteBehind() # Queued cell writes must reach Google Sheets before this operation changes or reads them.
+        request = SERVICE.spreadsheets().batchUpdate(spreadsheetId=self._spreadsheet._spreadsheetId,
+        body={
+            'requests': [{'copyPaste': {'source': sourceRange.toGridRange(self._sheetId),
+                                        'destination': CellRange(destinationStartColumn, destinationStartRow,
+                                                                 destinationEndColumn, destinationEndRow).toGridRange(destinationSheet._sheetId),
+                                        'pasteType': PASTE_TYPES[pasteType],
+                                        'pasteOrientation': 'NORMAL'}}]})
+        _acquireWriteQuota()
+        request.execute(http=_getHttp())
+
+        if pasteType in ('normal', 'values', 'formula'):
+            # copyPaste doesn't reply with the new values, and relative references and the destination's formats change them:
+            destinationSheet._refreshRange(CellRange(destinationStartColumn, destinationStartRow, destinationEndColumn, destinationEndRow))
 
 
     def delete(self):
         if len(self._spreadsheet.sheets) == 1:
             raise ValueError('Cannot delete all sheets; spreadsheets must have at least one sheet')
 
-        request = SERVICE.spreadsheets().batchUpdate(spreadsheetId=self._spreadsheet._spreadsheetId,
-            body={
-                'requests': [{'deleteSheet': {'sheetId': self._sheetId}}]})
-        request.execute(); _logWriteRequest()
-        self._spreadsheet.refresh() # Refresh the spreadsheet's list of sheets.
+        self._spreadsheet._batchUpdate([{'deleteSheet': {'sheetId': self._sheetId}}])
+        # Remove this sheet from the spreadsheet's list of sheets:
+        self._spreadsheet._setSheetsLocally([sheet for sheet in self._spreadsheet.sheets if sheet._sheetId != self._sheetId])
 
 
     def resize(self, columnCount=None, rowCount=None):
@@ -1020,31 +2494,1011 @@ class Sheet():
             raise TypeError('columnCount arg must be a positive nonzero int, not %r' % (columnCount))
 
 
-        request = SERVICE.spreadsheets().batchUpdate(spreadsheetId=self._spreadsheet._spreadsheetId,
-        body={
-            'requests': [{'updateSheetProperties': {'properties': {'sheetId': self._sheetId,
-                                                                   'gridProperties': {'rowCount': rowCount,
-                                                                                      'columnCount': columnCount}},
-                                                    'fields': 'gridProperties'}}]})
-        request.execute(); _logWriteRequest()
+        self._spreadsheet._batchUpdate([{'updateSheetProperties': {'properties': {'sheetId': self._sheetId,
+                                                                                  'gridProperties': {'rowCount': rowCount,
+                                                                                                     'columnCount': columnCount}},
+                                                                   'fields': 'gridProperties'}}])
         self._rowCount = rowCount
         self._columnCount = columnCount
 
     def __iter__(self):
         return iter(self.getRows())
 
-    def downloadAsCSV(self):
-        pass # TODO
-    def downloadAsExcel(self):
-        pass # TODO
-    def downloadAsODS(self):
-        pass # TODO
-    def downloadAsPDF(self):
-        pass # TODO
-    def downloadAsHTML(self):
-        pass # TODO
-    def downloadAsTSV(self):
-        pass # TODO
+
+    def downloadAsCSV(self, filename=None, windowRows=DEFAULT_DOWNLOAD_WINDOW_ROWS, useLocalData=False):
+        """
+        Writes the sheet's data to a CSV file. The data is read from Google
+        Sheets `windowRows` rows at a time and written as it arrives, so the
+        full sheet is never held in memory. If `useLocalData` is True, the
+        local copy of the sheet data is written instead and no requests are made.
+
+        :param filename: A filename str or an open text-mode file object. Defaults to the sheet's title plus '.csv'.
+        :returns: str - the filename written to, or None if a file object was passed.
+        """
+        return self._downloadAsDelimited(filename, ',', '.csv', windowRows, useLocalData)
+
+
+    def downloadAsExcel(self, filename=None, chunkSize=DEFAULT_DOWNLOAD_CHUNK_SIZE, progressCallback=None):
+        """
+        Downloads the entire spreadsheet this sheet belongs to. Google Drive
+        can only export whole spreadsheets, so this is the same as calling
+        `sheet.spreadsheet.downloadAsExcel()`.
+        """
+        return self._spreadsheet.downloadAsExcel(filename, chunkSize, progressCallback)
+
+
+    def downloadAsODS(self, filename=None, chunkSize=DEFAULT_DOWNLOAD_CHUNK_SIZE, progressCallback=None):
+        """
+        Downloads the entire spreadsheet this sheet belongs to. Google Drive
+        can only export whole spreadsheets, so this is the same as calling
+        `sheet.spreadsheet.downloadAsODS()`.
+        """
+        return self._spreadsheet.downloadAsODS(filename, chunkSize, progressCallback)
+
+
+    def downloadAsPDF(self, filename=None, chunkSize=DEFAULT_DOWNLOAD_CHUNK_SIZE, progressCallback=None):
+        """
+        Downloads the entire spreadsheet this sheet belongs to. Google Drive
+        can only export whole spreadsheets, so this is the same as calling
+        `sheet.spreadsheet.downloadAsPDF()`.
+        """
+        return self._spreadsheet.downloadAsPDF(filename, chunkSize, progressCallback)
+
+
+    def downloadAsHTML(self, filename=None, chunkSize=DEFAULT_DOWNLOAD_CHUNK_SIZE, progressCallback=None):
+        """
+        Downloads the entire spreadsheet this sheet belongs to as a zip of .html files. Google Drive
+        can only export whole spreadsheets, so this is the same as calling
+        `sheet.spreadsheet.downloadAsHTML()`.
+        """
+        return self._spreadsheet.downloadAsHTML(filename, chunkSize, progressCallback)
+
+
+    def downloadAsTSV(self, filename=None, windowRows=DEFAULT_DOWNLOAD_WINDOW_ROWS, useLocalData=False):
+        """
+        Writes the sheet's data to a TSV file. See `downloadAsCSV()` for details.
+
+        :param filename: A filename str or an open text-mode file object. Defaults to the sheet's title plus '.tsv'.
+        :returns: str - the filename written to, or None if a file object was passed.
+        """
+        return self._downloadAsDelimited(filename, '\t', '.tsv', windowRows, useLocalData)
+
+
+    def _downloadAsDelimited(self, filename, delimiter, extension, windowRows, useLocalData):
+        if not isinstance(windowRows, int):
+            raise TypeError('windowRows arg must be an int, not %s' % (type(windowRows).__name__))
+        if windowRows < 1:
+            raise ValueError('windowRows arg must be at least 1, not %r' % (windowRows))
+
+        if filename is None:
+            filename = _getSafeFilename(self._title) + extension
+
+        if isinstance(filename, str):
+            with open(filename, 'w', newline='', encoding='utf-8') as fileObj:
+                self._writeDelimitedRows(csv.writer(fileObj, delimiter=delimiter), windowRows, useLocalData)
+            return filename
+        else:
+            self._writeDelimitedRows(csv.writer(filename, delimiter=delimiter), windowRows, useLocalData)
+            return None
+
+
+    def _writeDelimitedRows(self, writer, windowRows, useLocalData):
+        if useLocalData:
+            columnCount, rowCount = self._getDataExtent()
+            for rowNum in range(1, rowCount + 1):
+                row = [self._cells.get((colNum, rowNum), '') for colNum in range(1, columnCount + 1)]
+                while row and row[-1] == '':
+                    row.pop() # Leave off trailing blank cells, the same as Google Sheets does.
+                writer.writerow(row)
+            return
+
+        self._spreadsheet._flushWriteBehind() # The rows are read from Google Sheets, so queued writes must be sent first.
+
+        # Google Sheets leaves trailing blank rows out of each response, so
+        # blank rows are only written once a later row turns out to have data.
+        pendingBlankRows = 0
+        for windowStartRow in range(1, self._rowCount + 1, windowRows):
+            windowStopRow = min(windowStartRow + windowRows - 1, self._rowCount)
+            _acquireReadQuota()
+            response = SERVICE.spreadsheets().values().get(
+                spreadsheetId=self._spreadsheet._spreadsheetId,
+                range=_formatA1Range(self._title, 1, windowStartRow, self._columnCount, windowStopRow),
+                majorDimension='ROWS').execute(http=_getHttp())
+
+            rows = response.get('values', [])
+            for row in rows:
+                if len(row) == 0:
+                    pendingBlankRows += 1
+                    continue
+                for i in range(pendingBlankRows):
+                    writer.writerow([])
+                pendingBlankRows = 0
+                writer.writerow(row)
+            pendingBlankRows += (windowStopRow - windowStartRow + 1) - len(rows)
+
+
+    def exportArrow(self, filename, header=True, rowGroupSize=DEFAULT_EXPORT_ROW_GROUP_SIZE):
+        """
+        Writes the locally stored sheet data to an Arrow IPC file. Column types
+        are inferred from the cell values, and rows are written in record batches
+        of `rowGroupSize` rows so that only one batch is held in memory at a time.
+        Requires pyarrow (`pip install ezsheets[arrow]`).
+
+        :param header: If True, row 1 is used for the column names instead of data.
+        """
+        pa = _importPyarrow()
+        import pyarrow.ipc
+
+        schema, batches = self._getArrowSchemaAndBatches(pa, header, rowGroupSize)
+        with pyarrow.ipc.new_file(filename, schema) as writer:
+            for batch in batches:
+                writer.write_batch(batch)
+
+
+    def exportParquet(self, filename, header=True, rowGroupSize=DEFAULT_EXPORT_ROW_GROUP_SIZE):
+        """
+        Writes the locally stored sheet data to a Parquet file, with one row
+        group per `rowGroupSize` rows. See `exportArrow()` for details.
+        Requires pyarrow (`pip install ezsheets[arrow]`).
+        """
+        pa = _importPyarrow()
+        import pyarrow.parquet
+
+        schema, batches = self._getArrowSchemaAndBatches(pa, header, rowGroupSize)
+        with pyarrow.parquet.ParquetWriter(filename, schema) as writer:
+            for batch in batches:
+                writer.write_table(pa.Table.from_batches([batch], schema=schema))
+
+
+    def _getDataExtent(self):
+        # Returns the (columnCount, rowCount) of the smallest grid that holds all the non-blank local cells.
+        maxColumn = maxRow = 0
+        for (colNum, rowNum), value in self._cells.items():
+            if value == '':
+                continue
+            if colNum > maxColumn:
+                maxColumn = colNum
+            if rowNum > maxRow:
+                maxRow = rowNum
+        return (maxColumn, maxRow)
+
+
+    def _getArrowSchemaAndBatches(self, pa, header, rowGroupSize):
+        if not isinstance(rowGroupSize, int):
+            raise TypeError('rowGroupSize arg must be an int, not %s' % (type(rowGroupSize).__name__))
+        if rowGroupSize < 1:
+            raise ValueError('rowGroupSize arg must be at least 1, not %r' % (rowGroupSize))
+
+        columnCount, rowCount = self._getDataExtent()
+        firstDataRow = 2 if header else 1
+        cells = self._cells
+
+        # Name the columns after the header row, falling back to column letters for blank or repeated names, and
+        # adding a numeric suffix if a column letter is also another column's name:
+        names = []
+        usedNames = set()
+        for colNum in range(1, columnCount + 1):
+            name = str(cells.get((colNum, 1), '')) if header else ''
+            if name == '' or name in usedNames:
+                name = getColumnLetterOf(colNum)
+            names.append(_getUniqueName(name, usedNames))
+
+        # Infer each column's type with a pass over the cell store (this doesn't copy any data):
+        columnTypes = [_inferArrowColumnType(cells.get((colNum, rowNum), '') for rowNum in range(firstDataRow, rowCount + 1))
+                       for colNum in range(1, columnCount + 1)]
+        schema = pa.schema([(name, _ARROW_TYPE_FACTORIES[columnType](pa)) for name, columnType in zip(names, columnTypes)])
+
+        def generateBatches():
+            for batchStartRow in range(firstDataRow, rowCount + 1, rowGroupSize):
+                batchStopRow = min(batchStartRow + rowGroupSize, rowCount + 1)
+                arrays = []
+                for colNum, columnType in zip(range(1, columnCount + 1), columnTypes):
+                    convert = _ARROW_VALUE_CONVERTERS[columnType]
+                    arrays.append(pa.array([convert(cells.get((colNum, rowNum), '')) for rowNum in range(batchStartRow, batchStopRow)],
+                                           type=schema.field(colNum - 1).type))
+                yield pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+        return schema, generateBatches()
+
+
+CellChange = collections.namedtuple('CellChange', 'column row oldValue newValue')
+
+
+def _diffCells(oldCells, newCells):
+    # Returns a list of CellChange namedtuples for the cells that differ between two `_cells` dicts, ordered by row then column.
+    changes = []
+    for key, newValue in newCells.items():
+        oldValue = oldCells.get(key, '')
+        if oldValue != newValue:
+            changes.append(CellChange(key[0], key[1], oldValue, newValue))
+    for key, oldValue in oldCells.items():
+        if key not in newCells and oldValue != '':
+            changes.append(CellChange(key[0], key[1], oldValue, ''))
+    changes.sort(key=lambda change: (change.row, change.column))
+    return changes
+
+
+class SheetFormatter():
+    """
+    Collects formatting operations for a Sheet and compiles them into one
+    batchUpdate request. Create these with `Sheet.format()`. Operations on
+    the same range are merged into a single repeatCell request, and column
+    widths and row heights are merged into one updateDimensionProperties
+    request per run of same-sized columns or rows. Color args can be a color
+    name from colorvalues.py like 'light gray', an RGB or RGBA tuple, or
+    None to reset the color. Each method returns the SheetFormatter object,
+    so calls can be chained.
+    """
+    def __init__(self, sheet):
+        self._sheet = sheet
+        self._cellFormats = [] # List of [CellRange, {field path: value}] lists, in the order they're applied.
+        self._columnWidths = collections.OrderedDict() # Maps column numbers to pixel sizes.
+        self._rowHeights = collections.OrderedDict() # Maps row numbers to pixel sizes.
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, excType, excValue, traceback):
+        # Nothing is sent if the with block raised an exception.
+        if excType is None:
+            self.apply()
+
+
+    def _setCellFormat(self, cellRange, fieldPath, value):
+        # Open-ended ranges like 'A2:A' stay open-ended, so the format also covers rows and columns added later.
+        cellRange = self._sheet._getOwnCellRange(cellRange, bounded=False)
+        # Merge into the latest operation on the same range, unless a later operation sets the same field on overlapping cells.
+        for cellFormat in reversed(self._cellFormats):
+            if cellFormat[0] == cellRange:
+                cellFormat[1][fieldPath] = value
+                return self
+            if fieldPath in cellFormat[1] and _cellRangesOverlap(cellFormat[0], cellRange):
+                break
+        self._cellFormats.append([cellRange, collections.OrderedDict([(fieldPath, value)])])
+        return self
+
+
+    def bold(self, cellRange, value=True):
+        """Makes the text in `cellRange` bold (or not bold if `value` is False)."""
+        return self._setCellFormat(cellRange, 'textFormat.bold', bool(value))
+
+
+    def italic(self, cellRange, value=True):
+        """Makes the text in `cellRange` italic (or not italic if `value` is False)."""
+        return self._setCellFormat(cellRange, 'textFormat.italic', bool(value))
+
+
+    def fontSize(self, cellRange, size):
+        """Sets the font size of the text in `cellRange`."""
+        if not isinstance(size, int):
+            raise TypeError('size arg must be an int, not %s' % (type(size).__name__))
+        if size < 1:
+            raise ValueError('size arg must be at least 1, not %r' % (size))
+        return self._setCellFormat(cellRange, 'textFormat.fontSize', size)
+
+
+    def textColor(self, cellRange, color):
+        """Sets the color of the text in `cellRange`."""
+        return self._setCellFormat(cellRange, 'textFormat.foregroundColor', _getTabColorArg(color))
+
+
+    def background(self, cellRange, color):
+        """Sets the background color of `cellRange`."""
+        return self._setCellFormat(cellRange, 'backgroundColor', _getTabColorArg(color))
+
+
+    def numberFormat(self, cellRange, pattern, formatType='NUMBER'):
+        """
+        Sets the number format of `cellRange` to `pattern`, like '0.00' or
+        'yyyy-mm-dd'. `formatType` is one of NUMBER_FORMAT_TYPES.
+        """
+        if not isinstance(pattern, str):
+            raise TypeError('pattern arg must be a str, not %s' % (type(pattern).__name__))
+        if formatType not in NUMBER_FORMAT_TYPES:
+            raise ValueError('formatType arg must be one of %r, not %r' % (NUMBER_FORMAT_TYPES, formatType))
+        return self._setCellFormat(cellRange, 'numberFormat', {'type': formatType, 'pattern': pattern})
+
+
+    def horizontalAlignment(self, cellRange, alignment):
+        """Sets the horizontal alignment of `cellRange` to 'left', 'center', or 'right'."""
+        if alignment not in HORIZONTAL_ALIGNMENTS:
+            raise ValueError('alignment arg must be one of %r, not %r' % (tuple(HORIZONTAL_ALIGNMENTS), alignment))
+        return self._setCellFormat(cellRange, 'horizontalAlignment', HORIZONTAL_ALIGNMENTS[alignment])
+
+
+    def columnWidth(self, columns, pixels):
+        """
+        Sets the width of `columns` in pixels. `columns` can be a column int or
+        letters like 'B', or a range of columns like 'B:D'.
+        """
+        cellRange = self._getDimensionRange(columns, pixels)
+        endColumn = self._sheet._columnCount if cellRange.endColumn is None else cellRange.endColumn
+        for colNum in range(cellRange.startColumn, endColumn + 1):
+            self._columnWidths[colNum] = pixels
+        return self
+
+
+    def rowHeight(self, rows, pixels):
+        """
+        Sets the height of `rows` in pixels. `rows` can be a row int or a range
+        of rows like '2:5'.
+        """
+        cellRange = self._getDimensionRange(rows, pixels)
+        endRow = self._sheet._rowCount if cellRange.endRow is None else cellRange.endRow
+        for rowNum in range(cellRange.startRow, endRow + 1):
+            self._rowHeights[rowNum] = pixels
+        return self
+
+
+    def _getDimensionRange(self, key, pixels):
+        if not isinstance(pixels, int):
+            raise TypeError('pixels arg must be an int, not %s' % (type(pixels).__name__))
+        if pixels < 0:
+            raise ValueError('pixels arg must be at least 0, not %r' % (pixels))
+        if isinstance(key, int):
+            if key < 1:
+                raise IndexError('Google Sheets\' columns and rows are 1-based, not 0-based, so %r is not valid' % (key))
+            return CellRange(key, key, key, key)
+        if isinstance(key, str) and ':' not in key:
+            if key.isdigit():
+                key = '%s:%s' % (key, key)
+            else:
+                key = '%s:%s' % (key.upper(), key.upper())
+        return self._sheet._getOwnCellRange(key, bounded=False) # 'B:D' is open-ended in rows, which don't matter for column widths.
+
+
+    def getRequests(self):
+        """Returns the list of batchUpdate request dicts that `apply()` would send."""
+        sheetId = self._sheet._sheetId
+        requests = []
+        for cellRange, fieldValues in self._cellFormats:
+            userEnteredFormat = {}
+            for fieldPath, value in fieldValues.items():
+                if value is None:
+                    continue # Leaving the value out resets the field to its default.
+                parent = userEnteredFormat
+                names = fieldPath.split('.')
+                for name in names[:-1]:
+                    parent = parent.setdefault(name, {})
+                parent[names[-1]] = value
+            requests.append({'repeatCell': {'range': cellRange.toGridRange(sheetId),
+                                            'cell': {'userEnteredFormat': userEnteredFormat},
+                                            'fields': ','.join('userEnteredFormat.' + fieldPath for fieldPath in fieldValues)}})
+
+        for dimension, pixelSizes in (('COLUMNS', self._columnWidths), ('ROWS', self._rowHeights)):
+            # Each run of consecutive columns or rows with the same size becomes one request.
+            runStart = runEnd = runPixels = None
+            for index in sorted(pixelSizes) + [None]:
+                if index is not None and runEnd == index - 1 and pixelSizes[index] == runPixels:
+                    runEnd = index
+                    continue
+                if runStart is not None:
+                    requests.append({'updateDimensionProperties': {
+                        'range': {'sheetId': sheetId, 'dimension': dimension, 'startIndex': runStart - 1, 'endIndex': runEnd},
+                        'properties': {'pixelSize': runPixels},
+                        'fields': 'pixelSize'}})
+                if index is not None:
+                    runStart = runEnd = index
+                    runPixels = pixelSizes[index]
+        return requests
+
+
+    def apply(self):
+        """
+        Sends all of the collected formatting operations in one batchUpdate
+        request, then clears them. Does nothing if there are no operations.
+        Inside a `structuralBatch()` block, the operations join the batch
+        instead, so they can format sheets added earlier in the block.
+        """
+        requests = self.getRequests()
+        if not requests:
+            return
+        self._sheet._spreadsheet._batchUpdate(requests)
+
+        self._cellFormats = []
+        self._columnWidths.clear()
+        self._rowHeights.clear()
+
+
+def _isSingleCellRange(cellRange):
+    # Returns True if the CellRange is one cell, like 'B2' (or 'B2:B2'), rather than an open-ended range like 'B2:'.
+    return cellRange.isBounded and cellRange.startColumn == cellRange.endColumn and cellRange.startRow == cellRange.endRow
+
+
+def _cellRangesOverlap(range1, range2):
+    # Returns True if two CellRange objects share any cells. An end of None is the edge of the sheet.
+    range1 = range1.bounded(_MAX_TABLE_COLUMN_NUMBER, MAX_CELL_COUNT)
+    range2 = range2.bounded(_MAX_TABLE_COLUMN_NUMBER, MAX_CELL_COUNT)
+    return (range1.startColumn <= range2.endColumn and range2.startColumn <= range1.endColumn and
+            range1.startRow <= range2.endRow and range2.startRow <= range1.endRow)
+
+
+class SheetWatcher():
+    """
+    Polls a Sheet for changes in a background thread. Create these with
+    `Sheet.watch()`. SheetWatcher objects can be used in `with` statements,
+    which stop them at the end of the block.
+    """
+    def __init__(self, sheet, callback, minInterval=DEFAULT_WATCH_MIN_INTERVAL, maxInterval=DEFAULT_WATCH_MAX_INTERVAL, onError=None):
+        if not callable(callback):
+            raise TypeError('callback arg must be callable, not %s' % (type(callback).__name__))
+        if not isinstance(minInterval, (int, float)) or not isinstance(maxInterval, (int, float)):
+            raise TypeError('minInterval and maxInterval args must be numbers')
+        if minInterval <= 0:
+            raise ValueError('minInterval arg must be greater than 0, not %r' % (minInterval))
+        if maxInterval < minInterval:
+            raise ValueError('maxInterval arg (%r) must not be less than minInterval arg (%r)' % (maxInterval, minInterval))
+
+        self._sheet = sheet
+        self._callback = callback
+        self._minInterval = minInterval
+        self._maxInterval = maxInterval
+        self._onError = onError
+        self._interval = minInterval
+        self._lastVersion = None
+        self._stopEvent = threading.Event()
+        self._thread = None
+
+    @property
+    def interval(self):
+        """The number of seconds until the next poll."""
+        return self._interval
+
+    @property
+    def isRunning(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.isRunning:
+            return # Already started.
+        self._stopEvent.clear()
+        self._thread = threading.Thread(target=self._run, name='ezsheets-watch-%s' % (self._sheet.sheetId))
+        self._thread.daemon = True # Don't keep the program running just for this thread.
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        """Stops polling, and waits up to `timeout` seconds for the background thread to finish."""
+        self._stopEvent.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+        self.stop()
+
+    def _run(self):
+        while not self._stopEvent.wait(self._interval):
+            try:
+                changes = self.poll()
+                if changes:
+                    self._interval = self._minInterval
+                    self._callback(self._sheet, changes)
+                else:
+                    self._interval = min(self._interval * 2, self._maxInterval) # Back off while the sheet is quiet.
+            except Exception as exc:
+                # Exceptions from polling and from the callback both go to onError, and the watcher keeps polling.
+                if self._onError is None:
+                    raise
+                self._onError(exc)
+
+    def poll(self):
+        """
+        Checks the sheet for changes once, updating its local data, and
+        returns a list of CellChange namedtuples (empty if nothing changed).
+        The first poll compares against the sheet's local data as it was
+        when the watcher was created.
+        """
+        version = self._sheet._spreadsheet._getDriveVersion()
+        if version == self._lastVersion:
+            return [] # The spreadsheet hasn't changed, so don't read the sheet.
+
+        # Copy the cells, since update*() calls on other threads change the dict in place:
+        oldCells = dict(self._sheet._cells)
+        self._sheet.refresh()
+        changes = _diffCells(oldCells, dict(self._sheet._cells))
+        self._lastVersion = version # Only after the refresh worked, so a failed poll is retried.
+        return changes
+
+
+class WriteBehindQueue():
+    """
+    Sends a spreadsheet's cell writes from a background thread. Create these
+    with `Spreadsheet.writeBehind()`. WriteBehindQueue objects can be used in
+    `with` statements, which close them at the end of the block.
+    """
+    def __init__(self, spreadsheet, flushInterval=DEFAULT_WRITE_BEHIND_FLUSH_INTERVAL, flushCells=DEFAULT_WRITE_BEHIND_FLUSH_CELLS,
+                 maxQueued=DEFAULT_WRITE_BEHIND_MAX_QUEUED, onError=None):
+        if not isinstance(flushInterval, (int, float)):
+            raise TypeError('flushInterval arg must be a number, not %s' % (type(flushInterval).__name__))
+        if flushInterval <= 0:
+            raise ValueError('flushInterval arg must be greater than 0, not %r' % (flushInterval))
+        for argName, value in (('flushCells', flushCells), ('maxQueued', maxQueued)):
+            if not isinstance(value, int):
+                raise TypeError('%s arg must be an int, not %s' % (argName, type(value).__name__))
+            if value < 1:
+                raise ValueError('%s arg must be at least 1, not %r' % (argName, value))
+
+        self._spreadsheet = spreadsheet
+        self._flushInterval = flushInterval
+        self._flushCells = flushCells
+        self._onError = onError
+        self._queue = queue.Queue(maxQueued) # Holds ('write', valueRange), ('flush', event), and ('close', event) tuples.
+        self._error = None # The exception from a failed write, if there's no onError callback to give it to.
+        self._thread = None
+        self._closed = False
+
+    @property
+    def isRunning(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.isRunning:
+            return # Already started.
+        self._thread = threading.Thread(target=self._run, name='ezsheets-write-behind-%s' % (self._spreadsheet.spreadsheetId))
+        self._thread.daemon = True # Don't keep the program running just for this thread.
+        self._thread.start()
+
+    def put(self, valueRange):
+        """Queues a ValueRange dict to be written. Blocks while the queue is full."""
+        if self._closed:
+            raise EZSheetsException('this WriteBehindQueue is closed')
+        self._queue.put(('write', valueRange))
+
+    def flush(self):
+        """Waits until every write queued so far has been sent."""
+        if self._closed:
+            return
+        flushedEvent = threading.Event()
+        self._queue.put(('flush', flushedEvent))
+        flushedEvent.wait()
+        self._raiseError()
+
+    def close(self):
+        """Sends every queued write, stops the background thread, and turns off write-behind mode."""
+        if self._closed:
+            return
+        self._closed = True
+        closedEvent = threading.Event()
+        self._queue.put(('close', closedEvent))
+        closedEvent.wait()
+        self._thread.join()
+        if self._spreadsheet._writeBehind is self:
+            self._spreadsheet._writeBehind = None
+        self._raiseError()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+        self.close()
+
+    def _raiseError(self):
+        error, self._error = self._error, None
+        if error is not None:
+            raise error
+
+    def _run(self):
+        pending = collections.OrderedDict() # Maps ranges to ValueRange dicts, so a range written twice is only sent once.
+        pendingCells = 0
+        deadline = None # When the oldest pending write has waited flushInterval seconds.
+        while True:
+            try:
+                if deadline is None:
+                    kind, item = self._queue.get()
+                else:
+                    kind, item = self._queue.get(timeout=max(0, deadline - time.time()))
+            except queue.Empty:
+                kind, item = 'timeout', None
+
+            if kind == 'write':
+                if not pending:
+                    deadline = time.time() + self._flushInterval
+                # A later write to the same range replaces the earlier one, and moves it after any writes in between.
+                pending.pop(item['range'], None)
+                pending[item['range']] = item
+                pendingCells += sum(len(values) for values in item['values'])
+                if pendingCells < self._flushCells:
+                    continue
+
+            if pending:
+                self._send(list(pending.values()))
+                pending.clear()
+                pendingCells = 0
+                deadline = None
+
+            if kind in ('flush', 'close'):
+                item.set()
+            if kind == 'close':
+                return
+
+    def _send(self, valueRanges):
+        try:
+            self._spreadsheet._sendValueRanges(valueRanges, ordered=True) # Queued writes can overlap, so keep them in order.
+        except Exception as exc:
+            if self._onError is not None:
+                try:
+                    self._onError(exc, valueRanges)
+                    return
+                except Exception as callbackExc:
+                    exc = callbackExc # Don't let a failing callback stop the background thread.
+            self._error = exc
+
+
+def _splitValueRange(valueRange, maxBytes):
+    # Returns a list of (ValueRange dict, estimated bytes) tuples that split
+    # `valueRange` into bands of whole rows (or columns, for a 'COLUMNS'
+    # majorDimension) of at most `maxBytes` of JSON each. The band height is
+    # estimated from the average line size, and a band is halved until it
+    # fits. A single row larger than `maxBytes` becomes a band of its own.
+    lines = valueRange['values']
+    totalBytes = len(json.dumps(lines, default=str))
+    if totalBytes <= maxBytes:
+        return [(valueRange, totalBytes)]
+
+    cellRange = parseRange(valueRange['range'])
+    isRows = valueRange.get('majorDimension', 'ROWS') == 'ROWS'
+    linesPerBand = max(1, len(lines) * maxBytes // totalBytes)
+    bands = []
+    bandStart = 0
+    while bandStart < len(lines):
+        bandLines = min(linesPerBand, len(lines) - bandStart)
+        bandBytes = len(json.dumps(lines[bandStart:bandStart + bandLines], default=str))
+        while bandBytes > maxBytes and bandLines > 1:
+            bandLines //= 2 # These lines are larger than average, so try a smaller band.
+            bandBytes = len(json.dumps(lines[bandStart:bandStart + bandLines], default=str))
+        bandStop = bandStart + bandLines
+        if isRows:
+            bandRange = _formatA1Range(cellRange.sheetTitle, cellRange.startColumn, cellRange.startRow + bandStart,
+                                       cellRange.endColumn, cellRange.startRow + bandStop - 1)
+        else:
+            bandRange = _formatA1Range(cellRange.sheetTitle, cellRange.startColumn + bandStart, cellRange.startRow,
+                                       cellRange.startColumn + bandStop - 1, cellRange.endRow)
+        bands.append(({'range': bandRange,
+                       'majorDimension': valueRange.get('majorDimension', 'ROWS'),
+                       'values': lines[bandStart:bandStop]}, bandBytes))
+        bandStart = bandStop
+    return bands
+
+
+def _valueRangesOverlap(valueRanges):
+    # Returns True if any two of the ValueRange dicts write to the same cell.
+    cellRangesByTitle = {}
+    for valueRange in valueRanges:
+        cellRange = parseRange(valueRange['range']).bounded(_MAX_TABLE_COLUMN_NUMBER, MAX_CELL_COUNT)
+        cellRangesByTitle.setdefault(cellRange.sheetTitle, []).append(cellRange)
+    for cellRanges in cellRangesByTitle.values():
+        cellRanges.sort(key=lambda cellRange: cellRange.startRow)
+        for i, cellRange in enumerate(cellRanges):
+            for laterRange in cellRanges[i + 1:]:
+                if laterRange.startRow > cellRange.endRow:
+                    break # The ranges are sorted by their start row, so none of the rest can overlap this one.
+                if laterRange.startColumn <= cellRange.endColumn and cellRange.startColumn <= laterRange.endColumn:
+                    return True
+    return False
+
+
+def _getNumberOrNone(value):
+    # Returns `value` as an int or float if it is a number or a str of a number, otherwise None.
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return value
+    if isinstance(value, str):
+        if _INT_PATTERN.match(value):
+            return int(value)
+        if _FLOAT_PATTERN.match(value):
+            return float(value)
+    return None
+
+
+def _makeComparison(compare):
+    # Returns a predicate that compares a cell value to a query value, comparing
+    # as numbers when both are numbers (cells are often strs like '42'), and
+    # returning False instead of raising TypeError for values that can't be compared.
+    def predicate(cellValue, value):
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            cellNumber = _getNumberOrNone(cellValue)
+            if cellNumber is not None:
+                return compare(cellNumber, value)
+        try:
+            return compare(cellValue, value)
+        except TypeError:
+            return False
+    return predicate
+
+
+_QUERY_OPERATORS = {
+    '==':         _makeComparison(operator.eq),
+    '!=':         lambda cellValue, value: not _QUERY_OPERATORS['=='](cellValue, value),
+    '<':          _makeComparison(operator.lt),
+    '<=':         _makeComparison(operator.le),
+    '>':          _makeComparison(operator.gt),
+    '>=':         _makeComparison(operator.ge),
+    'in':         lambda cellValue, value: cellValue in value,
+    'not in':     lambda cellValue, value: cellValue not in value,
+    'contains':   lambda cellValue, value: str(value) in str(cellValue),
+    'startswith': lambda cellValue, value: str(cellValue).startswith(str(value)),
+    'endswith':   lambda cellValue, value: str(cellValue).endswith(str(value)),
+}
+
+
+class Query():
+    """
+    A lazily evaluated filter and projection over a Sheet's local data.
+    Create these with `Sheet.query()`. The where(), select(), and limit()
+    methods return new Query objects, so queries can be built up and reused.
+    Nothing is evaluated until the query is iterated over (or rows(),
+    rowNumbers(), first(), or count() is called), and the results always
+    reflect the sheet's current local data.
+    """
+    def __init__(self, sheet, headerRow=1):
+        if not isinstance(headerRow, int):
+            raise TypeError('headerRow arg must be an int, not %s' % (type(headerRow).__name__))
+        if headerRow < 1:
+            raise ValueError('headerRow arg must be at least 1, not %r' % (headerRow))
+        self._sheet = sheet
+        self._headerRow = headerRow
+        self._conditions = () # A tuple of (colNum, predicate, value) tuples.
+        self._selectedColumns = None # A tuple of colNums, or None for all columns.
+        self._limit = None
+
+    def _copy(self, **attrs):
+        query = Query(self._sheet, self._headerRow)
+        query._conditions = self._conditions
+        query._selectedColumns = self._selectedColumns
+        query._limit = self._limit
+        for name, value in attrs.items():
+            setattr(query, name, value)
+        return query
+
+    def _getColumnNumber(self, column):
+        # Columns are named by the str in the header row, or by an int column number.
+        if isinstance(column, int):
+            if column < 1:
+                raise IndexError('Column %s does not exist. Google Sheets\' columns and rows are 1-based, not 0-based.' % (column))
+            return column
+        if not isinstance(column, str):
+            raise TypeError('columns must be header strs or int column numbers, not %s' % (type(column).__name__))
+        header = self._sheet.rowView(self._headerRow, trimmed=True)
+        for colNum, name in enumerate(header, 1):
+            if name == column:
+                return colNum
+        raise KeyError('no column named %r in header row %s' % (column, self._headerRow))
+
+    def where(self, column, op, value=None):
+        """
+        Returns a new Query that also requires `column` to match `op` and
+        `value`. `op` is one of '==', '!=', '<', '<=', '>', '>=', 'in',
+        'not in', 'contains', 'startswith', or 'endswith', or a function that
+        takes the cell value and returns True or False (`value` is then unused).
+        Comparisons with int or float values compare number-like strs as numbers.
+        """
+        colNum = self._getColumnNumber(column)
+        if callable(op):
+            predicate, value = (lambda cellValue, unused, function=op: function(cellValue)), None
+        elif op in _QUERY_OPERATORS:
+            predicate = _QUERY_OPERATORS[op]
+        else:
+            raise ValueError('op arg must be a function or one of %r, not %r' % (tuple(_QUERY_OPERATORS), op))
+        return self._copy(_conditions=self._conditions + ((colNum, predicate, value),))
+
+    def select(self, *columns):
+        """Returns a new Query whose result rows only have the values of `columns`, in that order."""
+        if len(columns) == 0:
+            raise TypeError('select() requires at least one column')
+        return self._copy(_selectedColumns=tuple(self._getColumnNumber(column) for column in columns))
+
+    def limit(self, count):
+        """Returns a new Query that stops after `count` result rows."""
+        if not isinstance(count, int):
+            raise TypeError('count arg must be an int, not %s' % (type(count).__name__))
+        if count < 0:
+            raise ValueError('count arg must be at least 0, not %r' % (count))
+        return self._copy(_limit=count)
+
+    def rowNumbers(self):
+        """
+        Yields the 1-based row numbers of the matching rows. The predicates
+        are evaluated a column at a time over blocks of QUERY_BLOCK_ROWS rows,
+        so a limit() doesn't require evaluating the whole sheet.
+        """
+        sheet = self._sheet
+        found = 0
+        if self._limit == 0:
+            return
+        for blockStartRow in range(self._headerRow + 1, sheet._rowCount + 1, QUERY_BLOCK_ROWS):
+            cells = sheet._cells
+            rowNums = range(blockStartRow, min(blockStartRow + QUERY_BLOCK_ROWS, sheet._rowCount + 1))
+            for colNum, predicate, value in self._conditions:
+                rowNums = [rowNum for rowNum in rowNums if predicate(cells.get((colNum, rowNum), ''), value)]
+                if not rowNums:
+                    break
+            for rowNum in rowNums:
+                yield rowNum
+                found += 1
+                if self._limit is not None and found >= self._limit:
+                    return
+
+    def __iter__(self):
+        """Yields each matching row as a list of the selected columns' values."""
+        cells = self._sheet._cells
+        for rowNum in self.rowNumbers():
+            if self._selectedColumns is None:
+                columns = range(1, self._sheet._columnCount + 1)
+            else:
+                columns = self._selectedColumns
+            yield [cells.get((colNum, rowNum), '') for colNum in columns]
+
+    def rows(self):
+        """Returns a list of the matching rows."""
+        return list(self)
+
+    def first(self):
+        """Returns the first matching row, or None if no rows match."""
+        for row in self.limit(1):
+            return row
+        return None
+
+    def count(self):
+        """Returns the number of matching rows."""
+        return sum(1 for rowNum in self.rowNumbers())
+
+    def __repr__(self):
+        return '<%s of %r, %d conditions>' % (type(self).__name__, self._sheet._title, len(self._conditions))
+
+
+UpsertResult = collections.namedtuple('UpsertResult', 'updatedRows appendedRows updatedCells')
+
+
+_WHITESPACE_PATTERN = re.compile(r'\s+')
+
+def _cellValuesMatch(cellValue, value):
+    # Returns True if writing `value` wouldn't change a cell that has `cellValue`.
+    # Formatted cells are strs, so 42 matches '42'.
+    return cellValue == value or str(cellValue) == str(value)
+
+
+class _ColumnIndex():
+    """
+    A hash index of one column of a Sheet's local data, which maps each
+    non-blank value to the set of row numbers that have it.
+    """
+    def __init__(self, cells, colNum):
+        self._rowNumsByValue = {}
+        for (cellColNum, rowNum), value in cells.items():
+            if cellColNum == colNum:
+                self.add(rowNum, value)
+
+    def add(self, rowNum, value):
+        if value == '':
+            return # Blank cells aren't indexed.
+        self._rowNumsByValue.setdefault(value, set()).add(rowNum)
+
+    def remove(self, rowNum, value):
+        rowNums = self._rowNumsByValue.get(value)
+        if rowNums is None:
+            return
+        rowNums.discard(rowNum)
+        if not rowNums:
+            del self._rowNumsByValue[value]
+
+    def replace(self, rowNum, oldValue, newValue):
+        if oldValue != newValue:
+            self.remove(rowNum, oldValue)
+            self.add(rowNum, newValue)
+
+    def get(self, value):
+        return self._rowNumsByValue.get(value, ())
+
+    def items(self):
+        # Returns (value, set of row numbers) pairs for the indexed values.
+        return self._rowNumsByValue.items()
+
+
+class _CellView(collections.abc.Sequence):
+    """
+    The base class for RowView and ColumnView. Views are sequences backed by
+    a Sheet's local cell data; they don't copy any values, so they always
+    reflect the sheet's current local data. Slicing a view returns a list.
+    """
+    def __init__(self, sheet, number, trimmed):
+        self._sheet = sheet
+        self._number = number
+        self._trimmed = trimmed
+        if trimmed:
+            # Trimmed views have their length fixed when they are created:
+            length = self._getFullLength()
+            cells = sheet._cells
+            while length > 0 and cells.get(self._getKey(length), '') == '':
+                length -= 1
+            self._trimmedLength = length
+
+    def __len__(self):
+        if self._trimmed:
+            return self._trimmedLength
+        return self._getFullLength()
+
+    def __getitem__(self, key):
+        length = len(self)
+        cells = self._sheet._cells
+        if isinstance(key, slice):
+            return [cells.get(self._getKey(i + 1), '') for i in range(*key.indices(length))]
+        if not isinstance(key, int):
+            raise TypeError('%s indices must be integers or slices, not %s' % (type(self).__name__, type(key).__name__))
+        if key < 0: # Views are sequences, so they use 0-based and negative indexes like lists.
+            key += length
+        if not (0 <= key < length):
+            raise IndexError('%s index out of range' % (type(self).__name__))
+        return cells.get(self._getKey(key + 1), '')
+
+    def __iter__(self):
+        cells = self._sheet._cells
+        getKey = self._getKey
+        for i in range(1, len(self) + 1):
+            yield cells.get(getKey(i), '')
+
+    def __eq__(self, other):
+        if not isinstance(other, (list, tuple, _CellView)):
+            return NotImplemented
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        return result if result is NotImplemented else not result
+
+    __hash__ = None # Views are mutable (through the sheet), so they can't be hashed.
+
+    def __repr__(self):
+        return '<%s %s of %r, %d cells>' % (type(self).__name__, self._number, self._sheet._title, len(self))
+
+
+class RowView(_CellView):
+    """
+    A sequence of the values in one row of a Sheet. Create these with `Sheet.rowView()`.
+    """
+    def _getFullLength(self):
+        return self._sheet._columnCount
+
+    def _getKey(self, colNum):
+        return (colNum, self._number)
+
+
+class ColumnView(_CellView):
+    """
+    A sequence of the values in one column of a Sheet. Create these with `Sheet.columnView()`.
+    """
+    def _getFullLength(self):
+        return self._sheet._rowCount
+
+    def _getKey(self, rowNum):
+        return (self._number, rowNum)
+
+
+def _checkGrowthPolicy(growthPolicy):
+    if isinstance(growthPolicy, int) and not isinstance(growthPolicy, bool):
+        if growthPolicy < 1:
+            raise ValueError('growthPolicy chunk size must be at least 1, not %r' % (growthPolicy))
+    elif growthPolicy not in ('exact', 'double'):
+        raise ValueError("growthPolicy must be 'exact', 'double', or an int chunk size, not %r" % (growthPolicy))
+
+
+def _getGrownRowCount(rowCount, requestedRow, columnCount, growthPolicy, otherCellCount=0):
+    # Returns the new rowCount for a sheet of `rowCount` rows that needs `requestedRow` rows. The
+    # spreadsheet's other sheets have `otherCellCount` cells, which count against MAX_CELL_COUNT too.
+    if requestedRow <= rowCount:
+        return rowCount
+    if growthPolicy == 'double':
+        grownRowCount = max(requestedRow, rowCount * 2)
+    elif growthPolicy == 'exact':
+        grownRowCount = requestedRow
+    else:
+        chunkCount = (requestedRow - rowCount + growthPolicy - 1) // growthPolicy # Round up to a whole number of chunks.
+        grownRowCount = rowCount + chunkCount * growthPolicy
+    return max(requestedRow, min(grownRowCount, (MAX_CELL_COUNT - otherCellCount) // columnCount))
 
 
 def _getTabColorArg(value):
@@ -1089,19 +3543,454 @@ def _getTabColorArg(value):
     return tabColorArg
 
 
+def _checkRenderArgs(valueRender, dateTimeRender):
+    if valueRender not in VALUE_RENDER_OPTIONS:
+        raise ValueError('valueRender arg must be one of %r, not %r' % (tuple(VALUE_RENDER_OPTIONS), valueRender))
+    if dateTimeRender not in DATE_TIME_RENDER_OPTIONS:
+        raise ValueError('dateTimeRender arg must be one of %r, not %r' % (tuple(DATE_TIME_RENDER_OPTIONS), dateTimeRender))
+
+
+_SERIAL_EPOCH = datetime.datetime(1899, 12, 30) # Google Sheets serial number 0.0 is midnight on Dec 30, 1899.
+
+def convertSerialToDatetime(serial):
+    """convertSerialToDatetime(43466.5) => datetime.datetime(2019, 1, 1, 12, 0)"""
+    if isinstance(serial, bool) or not isinstance(serial, (int, float)):
+        raise TypeError('serial must be an int or float, not a %r' % (type(serial).__name__))
+    return _SERIAL_EPOCH + datetime.timedelta(days=serial)
+
+
+def convertSerialsToDatetimes(serials):
+    """
+    Converts an iterable of Google Sheets serial numbers (as read with
+    `valueRender='unformatted'` and `dateTimeRender='serial'`) into a list of
+    datetime objects. Blank cells ('' or None) become None.
+    """
+    epoch = _SERIAL_EPOCH # Local variables are faster to look up than globals in the loop.
+    timedelta = datetime.timedelta
+    return [None if serial == '' or serial is None else epoch + timedelta(days=serial) for serial in serials]
+
+
+def _importPyarrow():
+    try:
+        import pyarrow
+    except ImportError:
+        raise EZSheetsException('Exporting to Arrow or Parquet requires the pyarrow module. Run `pip install ezsheets[arrow]` to install it.')
+    return pyarrow
+
+
+_INT_PATTERN = re.compile(r'^[-+]?\d+$')
+_FLOAT_PATTERN = re.compile(r'^[-+]?(\d+\.?\d*|\.\d+)([eE][-+]?\d+)?$')
+
+# Numbers written with leading zeros or an explicit sign, like ZIP codes '02134' or '+5', are exported as strings so
+# that the exact text is kept:
+_ARROW_INT_PATTERN = re.compile(r'^-?(0|[1-9]\d*)$')
+_ARROW_FLOAT_PATTERN = re.compile(r'^-?(0|[1-9]\d*)(\.\d+)?([eE][-+]?\d+)?$')
+_MIN_INT64 = -2 ** 63
+_MAX_INT64 = 2 ** 63 - 1
+
+def _inferArrowColumnType(values):
+    # Returns 'bool', 'int', 'float', or 'string' for the narrowest type that holds every non-blank value.
+    columnType = None
+    for value in values:
+        if value == '' or value is None:
+            continue
+
+        if isinstance(value, bool) or (isinstance(value, str) and value.upper() in ('TRUE', 'FALSE')):
+            valueType = 'bool'
+        elif isinstance(value, int) or (isinstance(value, str) and _ARROW_INT_PATTERN.match(value)):
+            if not _MIN_INT64 <= int(value) <= _MAX_INT64:
+                return 'string' # Too large for int64, and a float would lose digits.
+            valueType = 'int'
+        elif isinstance(value, float) or (isinstance(value, str) and _ARROW_FLOAT_PATTERN.match(value)):
+            valueType = 'float'
+        else:
+            return 'string' # Strings can hold anything, so there's no need to look at the rest of the values.
+
+        if columnType is None or columnType == valueType:
+            columnType = valueType
+        elif set((columnType, valueType)) == set(('int', 'float')):
+            columnType = 'float'
+        else:
+            return 'string'
+    return 'string' if columnType is None else columnType
+
+
+def _convertArrowBool(value):
+    if value == '' or value is None:
+        return None
+    if isinstance(value, str):
+        return value.upper() == 'TRUE'
+    return bool(value)
+
+def _convertArrowString(value):
+    if value == '' or value is None:
+        return None
+    return str(value)
+
+_ARROW_VALUE_CONVERTERS = {
+    'bool':   _convertArrowBool,
+    'int':    lambda value: None if value == '' or value is None else int(value),
+    'float':  lambda value: None if value == '' or value is None else float(value),
+    'string': _convertArrowString,
+}
+_ARROW_TYPE_FACTORIES = {
+    'bool':   lambda pa: pa.bool_(),
+    'int':    lambda pa: pa.int64(),
+    'float':  lambda pa: pa.float64(),
+    'string': lambda pa: pa.string(),
+}
+
+
+def _getSafeFilename(title):
+    # Replaces the characters that aren't allowed in filenames on Windows, macOS, or Linux.
+    return re.sub(r'[\\/:*?"<>|]', '_', title)
+
+
+def _getUniqueName(name, usedNames, caseSensitive=True):
+    # Returns `name`, or `name` with the smallest numeric suffix like '_2' that makes it unique among
+    # `usedNames`, and adds it to the `usedNames` set. Filenames aren't case-sensitive on Windows or macOS.
+    uniqueName = name
+    suffix = 2
+    while (uniqueName if caseSensitive else uniqueName.lower()) in usedNames:
+        uniqueName = '%s_%s' % (name, suffix)
+        suffix += 1
+    usedNames.add(uniqueName if caseSensitive else uniqueName.lower())
+    return uniqueName
+
+
+_CELL_PATTERN = re.compile(r'^([A-Za-z]+)([0-9]+)$')
+
 def convertToColumnRowInts(arg):
+    """convertToColumnRowInts('A1') => (1, 1), convertToColumnRowInts('AA10') => (27, 10)"""
     if not isinstance(arg, str):
         raise TypeError("argument must be a grid cell str, like 'A1', not of type %s" % (type(arg).__name__))
-    if not arg.isalnum() or not arg[0].isalpha() or not arg[-1].isdecimal():
+    mo = _CELL_PATTERN.match(arg)
+    if mo is None:
         raise ValueError("argument must be a grid cell str, like 'A1', not %r" % (arg))
+    return (getColumnNumber(mo.group(1)), int(mo.group(2)))
+
+
+class CellRange():
+    """
+    This class represents a range of cells in A1 notation, like 'B2:D50',
+    'Sheet2!A:A' (all of column A), '3:5' (all of rows 3 to 5), or 'A5:' (from
+    A5 to the end of the sheet). An end column or row of None means the range
+    extends to the edge of the sheet. CellRange objects are immutable; create
+    them from strings with `parseRange()`.
+    """
+    __slots__ = ('_sheetTitle', '_startColumn', '_startRow', '_endColumn', '_endRow')
+
+    def __init__(self, startColumn=1, startRow=1, endColumn=None, endRow=None, sheetTitle=None):
+        """
+        Initializer for CellRange objects. The column and row numbers are 1-based
+        and the end column and row are inclusive, e.g. CellRange(2, 2, 4, 50) is 'B2:D50'.
+        """
+        for argName, value in (('startColumn', startColumn), ('startRow', startRow), ('endColumn', endColumn), ('endRow', endRow)):
+            if value is None and argName.startswith('end'):
+                continue
+            if not isinstance(value, int):
+                raise TypeError('%s arg must be an int, not %s' % (argName, type(value).__name__))
+            if value < 1:
+                raise ValueError('%s arg must be at least 1, not %r' % (argName, value))
+        if endColumn is not None and endColumn < startColumn:
+            raise ValueError('endColumn arg (%r) must not be less than startColumn arg (%r)' % (endColumn, startColumn))
+        if endRow is not None and endRow < startRow:
+            raise ValueError('endRow arg (%r) must not be less than startRow arg (%r)' % (endRow, startRow))
+        if sheetTitle is not None and not isinstance(sheetTitle, str):
+            raise TypeError('sheetTitle arg must be a str, not %s' % (type(sheetTitle).__name__))
+
+        self._sheetTitle = sheetTitle
+        self._startColumn = startColumn
+        self._startRow = startRow
+        self._endColumn = endColumn
+        self._endRow = endRow
+
+    @property
+    def sheetTitle(self):
+        return self._sheetTitle
+
+    @property
+    def startColumn(self):
+        return self._startColumn
+
+    @property
+    def startRow(self):
+        return self._startRow
+
+    @property
+    def endColumn(self):
+        return self._endColumn
+
+    @property
+    def endRow(self):
+        return self._endRow
+
+    @property
+    def isBounded(self):
+        """True if the range has both an end column and an end row."""
+        return self._endColumn is not None and self._endRow is not None
+
+    def bounded(self, columnCount, rowCount):
+        """
+        Returns a CellRange where an end column or row of None is replaced by
+        `columnCount` or `rowCount`, e.g. the size of the sheet.
+        """
+        return CellRange(self._startColumn, self._startRow,
+                         columnCount if self._endColumn is None else self._endColumn,
+                         rowCount if self._endRow is None else self._endRow,
+                         self._sheetTitle)
+
+    def toGridRange(self, sheetId):
+        """
+        Returns the range as a GridRange dict for batchUpdate requests, which
+        uses 0-based indexes and exclusive ends. An end of None is left out,
+        which the API treats as the edge of the sheet.
+        """
+        gridRange = {'sheetId': sheetId,
+                     'startColumnIndex': self._startColumn - 1,
+                     'startRowIndex': self._startRow - 1}
+        if self._endColumn is not None:
+            gridRange['endColumnIndex'] = self._endColumn
+        if self._endRow is not None:
+            gridRange['endRowIndex'] = self._endRow
+        return gridRange
+
+    def withSheetTitle(self, sheetTitle):
+        """Returns a copy of this CellRange for the sheet titled `sheetTitle`."""
+        return CellRange(self._startColumn, self._startRow, self._endColumn, self._endRow, sheetTitle)
+
+    def toA1(self):
+        """Returns the range as an A1 notation str, like "'Sheet 2'!B2:D50"."""
+        return _formatA1Range(self._sheetTitle, self._startColumn, self._startRow, self._endColumn, self._endRow)
+
+    __str__ = toA1
+
+    def __repr__(self):
+        return '%s(%r)' % (type(self).__name__, self.toA1())
+
+    def __eq__(self, other):
+        if not isinstance(other, CellRange):
+            return NotImplemented
+        return self._key() == other._key()
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        return result if result is NotImplemented else not result
+
+    def __hash__(self):
+        return hash(self._key())
 
-    for i in range(1, len(arg)):
-        if arg[i].isdecimal():
-            column = getColumnNumber(arg[:i])
-            row = int(arg[i:])
-            return (column, row)
+    def _key(self):
+        return (self._sheetTitle, self._startColumn, self._startRow, self._endColumn, self._endRow)
 
-    assert False # pragma: no cover We know this will always return before this point because arg[-1].isdecimal().
+
+_RANGE_PATTERN = re.compile(r"""^
+    (?:(?:'(?P<quotedTitle>(?:[^']|'')+)'|(?P<title>[^'!]+))!)?  # optional sheet title, quoted or not, followed by !
+    (?P<startColumn>[A-Za-z]+)?(?P<startRow>[0-9]+)?
+    (?:(?P<colon>:)(?P<endColumn>[A-Za-z]+)?(?P<endRow>[0-9]+)?)?
+    $""", re.VERBOSE)
+
+@functools.lru_cache(maxsize=4096)
+def parseRange(rangeStr):
+    """
+    Parses an A1 notation str into a CellRange object:
+
+    parseRange('B2:D50')     => CellRange('B2:D50')
+    parseRange('Sheet2!A:A') => CellRange("'Sheet2'!A:A")
+    parseRange('3:5')        => CellRange('3:5')
+    parseRange('A5:')        => CellRange('A5:')
+    parseRange('B2')         => CellRange('B2')
+    """
+    if isinstance(rangeStr, CellRange):
+        return rangeStr
+    if not isinstance(rangeStr, str):
+        raise TypeError("range must be an A1 notation str, like 'A1:B2', not of type %s" % (type(rangeStr).__name__))
+    mo = _RANGE_PATTERN.match(rangeStr)
+    if mo is None or (mo.group('startColumn') is None and mo.group('startRow') is None):
+        raise ValueError("range must be an A1 notation str, like 'A1:B2', not %r" % (rangeStr))
+
+    if mo.group('quotedTitle') is not None:
+        sheetTitle = mo.group('quotedTitle').replace("''", "'")
+    else:
+        sheetTitle = mo.group('title')
+
+    startColumn = 1 if mo.group('startColumn') is None else getColumnNumber(mo.group('startColumn'))
+    startRow = 1 if mo.group('startRow') is None else int(mo.group('startRow'))
+    if mo.group('colon') is None:
+        if mo.group('startColumn') is None or mo.group('startRow') is None:
+            raise ValueError("range must be an A1 notation str, like 'A1:B2', not %r" % (rangeStr))
+        return CellRange(startColumn, startRow, startColumn, startRow, sheetTitle) # A single cell, like 'B2'.
+
+    endColumn = None if mo.group('endColumn') is None else getColumnNumber(mo.group('endColumn'))
+    endRow = None if mo.group('endRow') is None else int(mo.group('endRow'))
+    if mo.group('startColumn') is None and endColumn is not None:
+        raise ValueError("range must be an A1 notation str, like 'A1:B2', not %r" % (rangeStr)) # Ranges like '1:B5' aren't valid.
+    if mo.group('startRow') is None and endRow is not None and mo.group('endColumn') is None:
+        raise ValueError("range must be an A1 notation str, like 'A1:B2', not %r" % (rangeStr)) # Ranges like 'A:5' aren't valid.
+    return CellRange(startColumn, startRow, endColumn, endRow, sheetTitle)
+
+
+def _quoteSheetTitle(sheetTitle):
+    # Sheet titles are always quoted so that titles with spaces or titles like 'A1' aren't misread.
+    return "'%s'" % (sheetTitle.replace("'", "''"))
+
+
+def _formatA1Range(sheetTitle, startColumn, startRow, endColumn, endRow):
+    # Returns an A1 notation str like "'Sheet1'!A1:B2". This is used to build every range sent to Google Sheets.
+    if endColumn == startColumn and endRow == startRow:
+        cells = '%s%s' % (getColumnLetterOf(startColumn), startRow)
+    elif endColumn is None and endRow is not None and startColumn == 1:
+        cells = '%s:%s' % (startRow, endRow) # Whole rows, like '3:5'.
+    elif endRow is None and endColumn is not None and startRow == 1:
+        cells = '%s:%s' % (getColumnLetterOf(startColumn), getColumnLetterOf(endColumn)) # Whole columns, like 'A:B'.
+    else:
+        cells = '%s%s:%s%s' % (getColumnLetterOf(startColumn), startRow,
+                               '' if endColumn is None else getColumnLetterOf(endColumn),
+                               '' if endRow is None else endRow)
+    if sheetTitle is None:
+        return cells
+    return '%s!%s' % (_quoteSheetTitle(sheetTitle), cells)
+
+
+def batchGet(ranges, valueRender=DEFAULT_VALUE_RENDER, dateTimeRender=DEFAULT_DATE_TIME_RENDER, useBatchHttp=False):
+    """
+    Reads ranges of cells from many spreadsheets without creating Spreadsheet
+    or Sheet objects. The ranges of each spreadsheet are read with a single
+    values().batchGet request, and if `useBatchHttp` is True, the requests for
+    up to BATCH_HTTP_MAX_REQUESTS spreadsheets are sent together in one HTTP
+    batch request.
+
+    >>> ezsheets.batchGet({'16RWH9XBBwd8pRYZDSo9EontzdVPqxdGnwM5MnP6T48c': ['Sheet1!A1:B2', 'Sheet2!C:C']})
+    {'16RWH9XBBwd8pRYZDSo9EontzdVPqxdGnwM5MnP6T48c': {'Sheet1!A1:B2': [['a', 'b'], ['c', 'd']], 'Sheet2!C:C': [['e'], ['f']]}}
+
+    :param ranges: A dict that maps spreadsheet IDs (or URLs) to a list of A1 notation strs or CellRange objects.
+    :param valueRender: 'formatted', 'unformatted', or 'formula'. See `Spreadsheet()`.
+    :param dateTimeRender: 'serial' or 'formatted'. See `Spreadsheet()`.
+    :returns: dict - maps each spreadsheet ID to a dict that maps each of its ranges to a list of row lists. Trailing blank rows and cells are left out.
+    """
+    if not IS_INITIALIZED: init() # Initialize this module if not done so already.
+
+    if not isinstance(ranges, dict):
+        raise TypeError('ranges arg must be a dict of spreadsheet IDs to lists of ranges, not %s' % (type(ranges).__name__))
+    _checkRenderArgs(valueRender, dateTimeRender)
+
+    requestedRanges = collections.OrderedDict() # Maps spreadsheet IDs to their list of ranges.
+    for spreadsheetId, rangesOfSpreadsheet in ranges.items():
+        if isinstance(rangesOfSpreadsheet, (str, CellRange)):
+            rangesOfSpreadsheet = [rangesOfSpreadsheet]
+        if not isinstance(rangesOfSpreadsheet, (list, tuple)):
+            raise TypeError('ranges arg values must be lists of ranges, not %s' % (type(rangesOfSpreadsheet).__name__))
+        for cellRange in rangesOfSpreadsheet:
+            parseRange(cellRange) # Raise an exception now for invalid ranges rather than have the API raise one later.
+        requestedRanges.setdefault(getIdFromUrl(spreadsheetId), []).extend(rangesOfSpreadsheet)
+
+    results = {}
+    def storeResponse(spreadsheetId, response):
+        # The API returns the value ranges in the same order they were requested.
+        results[spreadsheetId] = {}
+        for cellRange, valueRange in zip(requestedRanges[spreadsheetId], response.get('valueRanges', [])):
+            results[spreadsheetId][cellRange] = valueRange.get('values', [])
+
+    def makeRequest(spreadsheetId):
+        return SERVICE.spreadsheets().values().batchGet(
+            spreadsheetId=spreadsheetId,
+            ranges=[str(cellRange) for cellRange in requestedRanges[spreadsheetId]],
+            majorDimension='ROWS',
+            valueRenderOption=VALUE_RENDER_OPTIONS[valueRender],
+            dateTimeRenderOption=DATE_TIME_RENDER_OPTIONS[dateTimeRender])
+
+    spreadsheetIds = list(requestedRanges)
+    if not useBatchHttp:
+        for spreadsheetId in spreadsheetIds:
+            _acquireReadQuota()
+            response = makeRequest(spreadsheetId).execute(http=_getHttp())
+            storeResponse(spreadsheetId, response)
+        return results
+
+    errors = []
+    def callback(requestId, response, exception):
+        if exception is not None:
+            errors.append(exception)
+        else:
+            storeResponse(requestId, response)
+
+    for i in range(0, len(spreadsheetIds), BATCH_HTTP_MAX_REQUESTS):
+        batch = SERVICE.new_batch_http_request(callback=callback)
+        for spreadsheetId in spreadsheetIds[i:i + BATCH_HTTP_MAX_REQUESTS]:
+            batch.add(makeRequest(spreadsheetId), request_id=spreadsheetId)
+            _acquireReadQuota() # Each call in a batch request counts against the read quota.
+        batch.execute(http=_getHttp())
+        if errors:
+            raise errors[0]
+    return results
+
+
+FanoutProgress = collections.namedtuple('FanoutProgress', 'completed total failed elapsed spreadsheetsPerSecond requestsPerSecond')
+FanoutResult = collections.namedtuple('FanoutResult', 'results errors elapsed requestCount')
+
+
+def fanout(spreadsheetIds, fn, concurrency=DEFAULT_FANOUT_CONCURRENCY, progressCallback=None):
+    """
+    Calls `fn(spreadsheet)` with a Spreadsheet object for each of
+    `spreadsheetIds`, working on `concurrency` spreadsheets at once in a
+    thread pool. All of the requests share `QUOTA_SCHEDULER`, so running
+    more threads never makes more requests than the quotas allow.
+
+    >>> result = ezsheets.fanout(tenantIds, lambda ss: ss[0].updateRow(1, ['Updated', str(datetime.date.today())]))
+    >>> result.errors
+    {}
+
+    :param spreadsheetIds: A list of spreadsheet IDs or URLs.
+    :param fn: A function that takes a Spreadsheet object. It's called from the pool's threads.
+    :param progressCallback: If given, called (from the calling thread) with a FanoutProgress namedtuple each time a spreadsheet is done.
+    :returns: FanoutResult - a namedtuple of a dict of `fn`'s return values by spreadsheet ID, a dict of exceptions by spreadsheet ID, the elapsed seconds, and the number of requests made from the pool's threads.
+    """
+    if not IS_INITIALIZED: init() # Initialize this module if not done so already, on this thread rather than a pool thread.
+
+    if not isinstance(spreadsheetIds, (list, tuple)):
+        raise TypeError('spreadsheetIds arg must be a list of spreadsheet IDs, not %s' % (type(spreadsheetIds).__name__))
+    if not callable(fn):
+        raise TypeError('fn arg must be callable, not %s' % (type(fn).__name__))
+    if not isinstance(concurrency, int):
+        raise TypeError('concurrency arg must be an int, not %s' % (type(concurrency).__name__))
+    if concurrency < 1:
+        raise ValueError('concurrency arg must be at least 1, not %r' % (concurrency))
+
+    requestCount = [0] # Only requests made by this call's pool threads count, not those of unrelated threads.
+    requestCountLock = threading.Lock()
+
+    def work(spreadsheetId):
+        threadStartCount = _getThreadRequestCount()
+        try:
+            return fn(Spreadsheet(spreadsheetId))
+        finally:
+            with requestCountLock:
+                requestCount[0] += _getThreadRequestCount() - threadStartCount
+
+    results = collections.OrderedDict()
+    errors = collections.OrderedDict()
+    startTime = time.time()
+    with concurrent.futures.ThreadPoolExecutor(concurrency) as executor:
+        futures = dict((executor.submit(work, spreadsheetId), spreadsheetId) for spreadsheetId in spreadsheetIds)
+        for future in concurrent.futures.as_completed(futures):
+            spreadsheetId = futures[future]
+            if future.exception() is None:
+                results[spreadsheetId] = future.result()
+            else:
+                errors[spreadsheetId] = future.exception()
+
+            if progressCallback is not None:
+                elapsed = time.time() - startTime
+                with requestCountLock:
+                    requestsSoFar = requestCount[0]
+                completed = len(results) + len(errors)
+                progressCallback(FanoutProgress(completed, len(futures), len(errors), elapsed,
+                                                completed / elapsed if elapsed else 0.0, requestsSoFar / elapsed if elapsed else 0.0))
+
+    # Order the results and errors like spreadsheetIds rather than by when they finished:
+    results = collections.OrderedDict((spreadsheetId, results[spreadsheetId]) for spreadsheetId in spreadsheetIds if spreadsheetId in results)
+    errors = collections.OrderedDict((spreadsheetId, errors[spreadsheetId]) for spreadsheetId in spreadsheetIds if spreadsheetId in errors)
+    return FanoutResult(results, errors, time.time() - startTime, requestCount[0])
 
 
 def createSpreadsheet(title=''):
@@ -1109,7 +3998,8 @@ def createSpreadsheet(title=''):
     request = SERVICE.spreadsheets().create(body={
         'properties': {'title': title}
         })
-    response = request.execute(); _logWriteRequest()
+    _acquireWriteQuota()
+    response = request.execute(http=_getHttp())
 
     return Spreadsheet(response['spreadsheetId'])
 
@@ -1126,48 +4016,56 @@ def getIdFromUrl(url):
     return spreadsheetId
 
 
+# Column letters are looked up in these tables, which are built once at import time so that threads can
+# read them without a lock:
+_MAX_TABLE_COLUMN_NUMBER = 18278 # Column ZZZ, the largest column Google Sheets allows.
+_COLUMN_LETTERS = [None] # _COLUMN_LETTERS[n] is the letters for column n, so index 0 is unused.
+_COLUMN_NUMBERS = {}     # Maps uppercase column letters to column numbers.
+for _number in range(1, _MAX_TABLE_COLUMN_NUMBER + 1):
+    # Each entry is built from an earlier entry: the letters for n are the letters for (n - 1) // 26 plus one letter.
+    _prefixNumber, _remainder = divmod(_number - 1, 26)
+    _COLUMN_LETTERS.append((_COLUMN_LETTERS[_prefixNumber] if _prefixNumber > 0 else '') + chr(_remainder + 65))
+    _COLUMN_NUMBERS[_COLUMN_LETTERS[_number]] = _number
+del _number, _prefixNumber, _remainder
+_COLUMN_LETTER_PATTERN = re.compile(r'^[A-Za-z]+$')
+
 def getColumnLetterOf(columnNumber):
     """getColumnLetterOf(1) => 'A', getColumnLetterOf(27) => 'AA'"""
+    if type(columnNumber) is int and 0 < columnNumber <= _MAX_TABLE_COLUMN_NUMBER:
+        return _COLUMN_LETTERS[columnNumber] # This is the fast path for every column Google Sheets allows.
     if not isinstance(columnNumber, int):
         raise TypeError('columnNumber must be an int, not a %r' % (type(columnNumber).__name__))
     if columnNumber < 1:
         raise ValueError('columnNumber must be an int value of at least 1')
 
-    letters = []
-    while columnNumber > 0:
-        columnNumber, remainder = divmod(columnNumber, 26)
-        if remainder == 0:
-            remainder = 26
-            columnNumber -= 1
-        letters.append(chr(remainder + 64))
-    return ''.join(reversed(letters))
+    # Columns past the table are built from a smaller column's letters:
+    prefixNumber, remainder = divmod(columnNumber - 1, 26)
+    return getColumnLetterOf(prefixNumber) + chr(remainder + 65)
 
 
 def getColumnNumber(columnLetter):
     """getColumnNumber('A') => 1, getColumnNumber('AA') => 27"""
+    try:
+        return _COLUMN_NUMBERS[columnLetter] # This is the fast path for uppercase letters up to ZZZ.
+    except (KeyError, TypeError):
+        pass
     if not isinstance(columnLetter, str):
         raise TypeError('columnLetter must be a str, not a %r' % (type(columnLetter).__name__))
-    if not columnLetter.isalpha():
+    if _COLUMN_LETTER_PATTERN.match(columnLetter) is None:
         raise ValueError('columnLetter must be composed of only letters')
 
-    columnLetter = columnLetter.upper()
-    digits = []
-
-    while columnLetter:
-        digits.append(ord(columnLetter[0]) - 64)
-        columnLetter = columnLetter[1:]
+    upperColumnLetter = columnLetter.upper()
+    if upperColumnLetter in _COLUMN_NUMBERS:
+        return _COLUMN_NUMBERS[upperColumnLetter]
 
     number = 0
-    place = 0
-    for digit in reversed(digits):
-        number += digit * (26 ** place)
-        place += 1
-
+    for letter in upperColumnLetter:
+        number = number * 26 + (ord(letter) - 64)
     return number
 
 
 def init(credentialsFile='credentials.json', tokenFile='token.pickle'):
-    global SERVICE, IS_INITIALIZED
+    global SERVICE, DRIVE_SERVICE, CREDENTIALS, IS_INITIALIZED, _INIT_THREAD
 
     if not os.path.exists(credentialsFile):
         raise EZSheetsException('Can\'t find credentials file at %s. You can download this file from https://developers.google.com/gmail/api/quickstart/python and clicking "Enable the Gmail API"' % (os.path.abspath(credentialsFile)))
@@ -1192,6 +4090,9 @@ def init(credentialsFile='credentials.json', tokenFile='token.pickle'):
             pickle.dump(creds, token)
 
     SERVICE = build('sheets', 'v4', credentials=creds)
+    DRIVE_SERVICE = build('drive', 'v3', credentials=creds)
+    CREDENTIALS = creds
+    _INIT_THREAD = threading.current_thread()
     IS_INITIALIZED = True
 
 
@@ -1,5 +1,6 @@
 from __future__ import division, print_function
 import random
+import time
 import pytest
 import ezsheets
 
@@ -107,6 +108,124 @@ def test_convertToColumnRowInts():
         ezsheets.convertToColumnRowInts(123)
 
 
+def test_parseRange():
+    assert ezsheets.parseRange('B2:D50') == ezsheets.CellRange(2, 2, 4, 50)
+    assert ezsheets.parseRange('b2:d50') == ezsheets.CellRange(2, 2, 4, 50)
+    assert ezsheets.parseRange('B2') == ezsheets.CellRange(2, 2, 2, 2)
+    assert ezsheets.parseRange('Sheet2!A:A') == ezsheets.CellRange(1, 1, 1, None, sheetTitle='Sheet2')
+    assert ezsheets.parseRange('3:5') == ezsheets.CellRange(1, 3, None, 5)
+    assert ezsheets.parseRange('A5:') == ezsheets.CellRange(1, 5, None, None)
+    assert ezsheets.parseRange('A5:B') == ezsheets.CellRange(1, 5, 2, None)
+    assert ezsheets.parseRange("'It''s a sheet!'!B2:C3") == ezsheets.CellRange(2, 2, 3, 3, sheetTitle="It's a sheet!")
+
+    for rangeStr in ('', '1', 'A', ':', '1:B5', 'B:5', 'B2:A1', 'A1:B2:C3'):
+        with pytest.raises(ValueError):
+            ezsheets.parseRange(rangeStr)
+    with pytest.raises(TypeError):
+        ezsheets.parseRange(123)
+
+
+def test_CellRange():
+    assert str(ezsheets.CellRange(2, 2, 4, 50)) == 'B2:D50'
+    assert str(ezsheets.CellRange(2, 2, 2, 2)) == 'B2'
+    assert str(ezsheets.CellRange(1, 1, 2, None, sheetTitle='My Sheet')) == "'My Sheet'!A:B"
+    assert str(ezsheets.CellRange(1, 3, None, 5)) == '3:5'
+    assert str(ezsheets.CellRange(1, 5)) == 'A5:'
+    assert str(ezsheets.CellRange(1, 1, 1, 1, sheetTitle="It's")) == "'It''s'!A1"
+
+    cellRange = ezsheets.parseRange('Sheet1!A5:')
+    assert cellRange.bounded(26, 1000) == ezsheets.parseRange('Sheet1!A5:Z1000')
+    assert not cellRange.isBounded
+    assert cellRange.bounded(26, 1000).isBounded
+    assert cellRange.withSheetTitle('Other').sheetTitle == 'Other'
+
+    for rangeStr in ('B2:D50', "'Sheet 2'!A:A", '3:5', 'A5:', "'It''s'!A1"):
+        assert ezsheets.parseRange(str(ezsheets.parseRange(rangeStr))) == ezsheets.parseRange(rangeStr)
+
+    with pytest.raises(ValueError):
+        ezsheets.CellRange(0, 1)
+    with pytest.raises(ValueError):
+        ezsheets.CellRange(2, 1, 1, 1)
+    with pytest.raises(TypeError):
+        ezsheets.CellRange('A', 1)
+
+
+def test_CellRange_toGridRange():
+    assert ezsheets.parseRange('B2:D50').toGridRange(0) == {'sheetId': 0, 'startColumnIndex': 1, 'startRowIndex': 1, 'endColumnIndex': 4, 'endRowIndex': 50}
+    assert ezsheets.parseRange('C:C').toGridRange(7) == {'sheetId': 7, 'startColumnIndex': 2, 'startRowIndex': 0, 'endColumnIndex': 3}
+
+
+def test__diffCells():
+    oldCells = {(1, 1): 'a', (2, 1): 'b', (1, 2): 'c'}
+    newCells = {(1, 1): 'a', (2, 1): 'B', (3, 3): 'd'}
+    assert ezsheets._diffCells(oldCells, newCells) == [ezsheets.CellChange(2, 1, 'b', 'B'),
+                                                       ezsheets.CellChange(1, 2, 'c', ''),
+                                                       ezsheets.CellChange(3, 3, '', 'd')]
+    assert ezsheets._diffCells(oldCells, dict(oldCells)) == []
+    assert ezsheets._diffCells({(1, 1): ''}, {}) == []
+
+
+def test__getGrownRowCount():
+    assert ezsheets._getGrownRowCount(1000, 900, 26, 'double') == 1000 # Already large enough.
+    assert ezsheets._getGrownRowCount(1000, 1001, 26, 'exact') == 1001
+    assert ezsheets._getGrownRowCount(1000, 1001, 26, 'double') == 2000
+    assert ezsheets._getGrownRowCount(1000, 2500, 26, 'double') == 2500
+    assert ezsheets._getGrownRowCount(1000, 1001, 26, 500) == 1500
+    assert ezsheets._getGrownRowCount(1000, 2600, 26, 500) == 3000
+
+    # Growth stops at the cell limit, but never below the requested row:
+    assert ezsheets._getGrownRowCount(150000, 150001, 26, 'double') == ezsheets.MAX_CELL_COUNT // 26
+    assert ezsheets._getGrownRowCount(300000, 300001, 26, 'double') == 300001
+    # The other sheets' cells count against the limit too:
+    assert ezsheets._getGrownRowCount(1000, 1001, 26, 'double', ezsheets.MAX_CELL_COUNT - 26 * 1500) == 1500
+
+    with pytest.raises(ValueError):
+        ezsheets._checkGrowthPolicy(0)
+    with pytest.raises(ValueError):
+        ezsheets._checkGrowthPolicy('triple')
+
+
+def test__splitValueRange():
+    valueRange = {'range': "'Sheet1'!A1:C5", 'majorDimension': 'ROWS', 'values': [['aaaa', 'bbbb', 'cccc']] * 5}
+    assert ezsheets._splitValueRange(valueRange, 1000) == [(valueRange, 130)]
+    bands = ezsheets._splitValueRange(valueRange, 60)
+    assert [band['range'] for band, size in bands] == ["'Sheet1'!A1:C2", "'Sheet1'!A3:C4", "'Sheet1'!A5:C5"]
+    assert [len(band['values']) for band, size in bands] == [2, 2, 1]
+
+    valueRange = {'range': "'Sheet1'!B1:D3", 'majorDimension': 'COLUMNS', 'values': [['aaaa', 'bbbb', 'cccc']] * 3}
+    bands = ezsheets._splitValueRange(valueRange, 40)
+    assert [band['range'] for band, size in bands] == ["'Sheet1'!B1:B3", "'Sheet1'!C1:C3", "'Sheet1'!D1:D3"]
+
+    # A row that's too large on its own is still sent, in a band of its own:
+    valueRange = {'range': "'Sheet1'!A1:A2", 'majorDimension': 'ROWS', 'values': [['x' * 100], ['y']]}
+    assert [band['range'] for band, size in ezsheets._splitValueRange(valueRange, 50)] == ["'Sheet1'!A1", "'Sheet1'!A2"]
+
+
+def test__valueRangesOverlap():
+    assert not ezsheets._valueRangesOverlap([{'range': "'Sheet1'!A1:B2"}, {'range': "'Sheet1'!C1:D2"}, {'range': "'Sheet1'!A3"}])
+    assert ezsheets._valueRangesOverlap([{'range': "'Sheet1'!A1:B2"}, {'range': "'Sheet1'!B2:C3"}])
+    assert not ezsheets._valueRangesOverlap([{'range': "'Sheet1'!A1:B2"}, {'range': "'Sheet2'!A1:B2"}])
+
+
+def test_QuotaScheduler(monkeypatch):
+    monkeypatch.setattr(ezsheets, 'READ_QUOTA', 2)
+    monkeypatch.setattr(ezsheets, 'QUOTA_WINDOW', 0.2)
+    scheduler = ezsheets.QuotaScheduler()
+    startTime = time.time()
+    for i in range(5):
+        scheduler.acquireRead() # 2 reads per 0.2 seconds, so the 5th read's slot is 0.4 seconds after the 1st.
+    assert time.time() - startTime >= 0.35
+    assert scheduler.readCount == 5
+    assert scheduler.writeCount == 0
+
+
+def test__getUniqueName():
+    usedNames = set()
+    assert [ezsheets._getUniqueName(name, usedNames) for name in ['B', 'B', 'B_2', 'b']] == ['B', 'B_2', 'B_2_2', 'b']
+    usedNames = set()
+    assert [ezsheets._getUniqueName(name, usedNames, caseSensitive=False) for name in ['Sales', 'SALES']] == ['Sales', 'SALES_2']
+
+
 def test__getTabColorArg():
     RED_COLOR = {'red': 1.0, 'green': 0.0, 'blue': 0.0, 'alpha': 1.0}
     assert ezsheets._getTabColorArg('red') == RED_COLOR
@@ -119,6 +238,37 @@ def test__getTabColorArg():
         ezsheets._getTabColorArg('invalid value')
 
 
+def test_convertSerialToDatetime():
+    import datetime
+    assert ezsheets.convertSerialToDatetime(0) == datetime.datetime(1899, 12, 30)
+    assert ezsheets.convertSerialToDatetime(43466.5) == datetime.datetime(2019, 1, 1, 12, 0)
+    assert ezsheets.convertSerialsToDatetimes([43466, '', None, 43467.25]) == [datetime.datetime(2019, 1, 1), None, None, datetime.datetime(2019, 1, 2, 6, 0)]
+
+    with pytest.raises(TypeError):
+        ezsheets.convertSerialToDatetime('43466')
+    with pytest.raises(TypeError):
+        ezsheets.convertSerialsToDatetimes(['43466'])
+
+
+def test__inferArrowColumnType():
+    assert ezsheets._inferArrowColumnType(['1', '2', '']) == 'int'
+    assert ezsheets._inferArrowColumnType(['1', '2.5']) == 'float'
+    assert ezsheets._inferArrowColumnType(['TRUE', 'false']) == 'bool'
+    assert ezsheets._inferArrowColumnType(['1', 'cat']) == 'string'
+    assert ezsheets._inferArrowColumnType(['', '']) == 'string'
+    assert ezsheets._inferArrowColumnType([1, 2.0]) == 'float'
+
+    # Leading zeros and explicit signs are kept by exporting the column as strings:
+    assert ezsheets._inferArrowColumnType(['02134', '10001']) == 'string'
+    assert ezsheets._inferArrowColumnType(['+5', '6']) == 'string'
+    assert ezsheets._inferArrowColumnType(['-5', '0', '0.5']) == 'float'
+
+    # Integers that don't fit in int64 are exported as strings rather than overflowing:
+    assert ezsheets._inferArrowColumnType(['1', '123456789012345678901234567890']) == 'string'
+    assert ezsheets._inferArrowColumnType([2 ** 63]) == 'string'
+    assert ezsheets._inferArrowColumnType([str(2 ** 63 - 1)]) == 'int'
+
+
 @pytest.fixture(scope='module')
 def init():
     global FIXED_SPREADSHEET
@@ -660,6 +810,636 @@ def test_gridProperties_settersGetters(init, checkPreAndPostCondition):
     assert FIXED_SPREADSHEET[0].columnGroupControlAfter == False
 
 
+def test_exportArrow_exportParquet(init, checkPreAndPostCondition, tmpdir):
+    pa = pytest.importorskip('pyarrow')
+    import pyarrow.ipc, pyarrow.parquet
+
+    newSheet = FIXED_SPREADSHEET.addSheet(title='New Sheet 1', columnCount=3, rowCount=5)
+    newSheet.updateRows([['name', 'count', 'ratio'], ['a', '1', '0.5'], ['b', '2', '1.5']])
+
+    filename = str(tmpdir.join('sheet.arrow'))
+    newSheet.exportArrow(filename, rowGroupSize=1)
+    table = pyarrow.ipc.open_file(filename).read_all()
+    assert table.column_names == ['name', 'count', 'ratio']
+    assert table.column('count').to_pylist() == [1, 2]
+    assert table.column('ratio').to_pylist() == [0.5, 1.5]
+
+    filenames = FIXED_SPREADSHEET.exportParquet(str(tmpdir.join('parquet')))
+    assert len(filenames) == 2
+    table = pyarrow.parquet.read_table(filenames[1])
+    assert table.column('name').to_pylist() == ['a', 'b']
+
+    newSheet.delete()
+
+
+def test_downloadAsCSV_downloadAsTSV(init, checkPreAndPostCondition, tmpdir):
+    newSheet = FIXED_SPREADSHEET.addSheet(title='New Sheet 1', columnCount=3, rowCount=6)
+    newSheet.updateRows([['a', 'b', 'c'], ['d', 'e, f', 'g'], [], ['h']])
+
+    filename = str(tmpdir.join('sheet.csv'))
+    assert newSheet.downloadAsCSV(filename, windowRows=2) == filename
+    with open(filename) as fo:
+        assert fo.read().splitlines() == ['a,b,c', 'd,"e, f",g', '', 'h']
+
+    filename = str(tmpdir.join('sheet.tsv'))
+    newSheet.downloadAsTSV(filename, useLocalData=True)
+    with open(filename) as fo:
+        assert fo.read().splitlines() == ['a\tb\tc', 'd\te, f\tg', '', 'h']
+
+    with pytest.raises(ValueError):
+        newSheet.downloadAsCSV(filename, windowRows=0)
+
+    newSheet.delete()
+
+
+def test_downloadAsExcel_ODS_PDF_HTML(init, checkPreAndPostCondition, tmpdir):
+    progress = []
+    filename = str(tmpdir.join('spreadsheet.xlsx'))
+    assert FIXED_SPREADSHEET.downloadAsExcel(filename, progressCallback=progress.append) == filename
+    assert progress[-1] == 1.0
+    with open(filename, 'rb') as fo:
+        assert fo.read(2) == b'PK' # .xlsx files are zip files.
+
+    filename = str(tmpdir.join('spreadsheet.pdf'))
+    assert FIXED_SPREADSHEET[0].downloadAsPDF(filename, chunkSize=1024) == filename
+    with open(filename, 'rb') as fo:
+        assert fo.read(4) == b'%PDF'
+
+    with open(str(tmpdir.join('spreadsheet.ods')), 'wb') as fo:
+        assert FIXED_SPREADSHEET.downloadAsODS(fo) is None
+
+    with pytest.raises(ValueError):
+        FIXED_SPREADSHEET.downloadAsHTML(str(tmpdir.join('spreadsheet.zip')), chunkSize=0)
+
+
+def test_valueRender(init, checkPreAndPostCondition):
+    newSheet = FIXED_SPREADSHEET.addSheet(title='New Sheet 1', columnCount=3, rowCount=3)
+    newSheet.updateRow(1, ['1234.5', 'TRUE', '=1+1'])
+    newSheet.refresh()
+    assert newSheet.getRow(1) == ['1234.5', 'TRUE', '2']
+
+    newSheet.valueRender = 'unformatted'
+    assert newSheet.getRow(1) == [1234.5, True, 2]
+
+    newSheet.valueRender = 'formula'
+    assert newSheet.get('C1') == '=1+1'
+
+    with pytest.raises(ValueError):
+        newSheet.valueRender = 'invalid arg'
+    with pytest.raises(ValueError):
+        newSheet.dateTimeRender = 'invalid arg'
+
+    newSheet.delete()
+
+
+def test_rowView_columnView(init, checkPreAndPostCondition):
+    newSheet = FIXED_SPREADSHEET.addSheet(title='New Sheet 1', columnCount=4, rowCount=5)
+    newSheet.updateRows([['a', 'b'], ['c'], ['', 'd']])
+
+    row = newSheet.rowView(1)
+    assert row == ['a', 'b', '', '']
+    assert len(row) == 4
+    assert row[0] == 'a'
+    assert row[-1] == ''
+    assert row[:2] == ['a', 'b']
+    assert newSheet.rowView(1, trimmed=True) == ['a', 'b']
+
+    column = newSheet.columnView('B')
+    assert list(column) == ['b', '', 'd', '', '']
+    assert newSheet.columnView(2, trimmed=True) == ['b', '', 'd']
+    assert 'd' in column
+
+    # Views read the local data as it is accessed:
+    newSheet.update('B2', 'e')
+    assert column[1] == 'e'
+
+    with pytest.raises(IndexError):
+        row[4]
+    with pytest.raises(IndexError):
+        newSheet.rowView(0)
+    with pytest.raises(TypeError):
+        newSheet.columnView(1.0)
+
+    newSheet.delete()
+
+
+def test_getRange_updateRange(init, checkPreAndPostCondition):
+    newSheet = FIXED_SPREADSHEET.addSheet(title='New Sheet 1', columnCount=4, rowCount=4)
+
+    newSheet.updateRange('B2', [['a', 'b'], ['c']])
+    assert newSheet.getRange('B2:C3') == [['a', 'b'], ['c', '']]
+    assert newSheet.getRows() == [['', '', '', ''], ['', 'a', 'b', ''], ['', 'c', '', ''], ['', '', '', '']]
+    assert newSheet.getRange('C:C') == [[''], ['b'], [''], ['']]
+    assert newSheet.getRange('C3:') == [['', ''], ['', '']]
+
+    newSheet['A1:B1'] = [['x', 'y']]
+    assert newSheet['A1:B2'] == [['x', 'y'], ['', 'a']]
+    newSheet['D4'] = 'z'
+    assert newSheet['D4'] == 'z'
+
+    # Writing past the edge of the sheet enlarges it:
+    newSheet.updateRange('D5', [['e', 'f']])
+    assert (newSheet.columnCount, newSheet.rowCount) == (5, 5)
+    newSheet.refresh()
+    assert newSheet.getRange('D4:E5') == [['z', ''], ['e', 'f']]
+
+    with pytest.raises(ValueError):
+        newSheet.updateRange('A1:B1', [['too', 'many', 'columns']])
+    with pytest.raises(ValueError):
+        newSheet.getRange('Other Sheet!A1:B2')
+    with pytest.raises(IndexError):
+        newSheet.getRange('G1:') # An open-ended range can't start past the edge of the sheet.
+    newSheet['G1:'] = [['g']] # Writing does enlarge the sheet, the same as updateRange() does.
+    assert newSheet.columnCount == 7
+    assert newSheet["'New Sheet 1'!G1"] == 'g'
+    with pytest.raises(TypeError):
+        newSheet.updateRange('A1', 'not a list of lists')
+    with pytest.raises(TypeError):
+        newSheet[1]
+
+    newSheet.delete()
+
+
+def test_batchGet(init, checkPreAndPostCondition):
+    newSheet = FIXED_SPREADSHEET.addSheet(title='New Sheet 1', columnCount=3, rowCount=3)
+    newSheet.updateRows([['a', 'b', 'c'], ['d', 'e', 'f']])
+
+    spreadsheetId = FIXED_SPREADSHEET.spreadsheetId
+    for useBatchHttp in (False, True):
+        result = ezsheets.batchGet({spreadsheetId: ["'New Sheet 1'!A1:B2", "'New Sheet 1'!C:C"]}, useBatchHttp=useBatchHttp)
+        assert result == {spreadsheetId: {"'New Sheet 1'!A1:B2": [['a', 'b'], ['d', 'e']],
+                                          "'New Sheet 1'!C:C": [['c'], ['f']]}}
+
+    with pytest.raises(TypeError):
+        ezsheets.batchGet(['not', 'a', 'dict'])
+    with pytest.raises(ValueError):
+        ezsheets.batchGet({spreadsheetId: ['invalid range']})
+
+    newSheet.delete()
+
+
+def test_copyRange_duplicateSheet_copyTo(init, checkPreAndPostCondition):
+    newSheet = FIXED_SPREADSHEET.addSheet(title='New Sheet 1', columnCount=4, rowCount=4)
+    newSheet.updateRows([['a', 'b'], ['c', 'd']])
+
+    newSheet.copyRange('A1:B2', destinationCell='C3')
+    assert newSheet.getRange('C3:D4') == [['a', 'b'], ['c', 'd']]
+    newSheet.refresh()
+    assert newSheet.getRange('C3:D4') == [['a', 'b'], ['c', 'd']]
+
+    duplicate = FIXED_SPREADSHEET.duplicateSheet(newSheet, title='New Sheet 2')
+    assert FIXED_SPREADSHEET.sheetTitles == ('Sheet1', 'New Sheet 1', 'New Sheet 2')
+    assert duplicate.index == 2
+    assert duplicate.getRows() == newSheet.getRows()
+
+    newSheet.copyRange('A1:A2', duplicate, 'E1', pasteType='values') # Enlarges the destination sheet.
+    assert duplicate.columnCount == 5
+    assert duplicate.getColumn('E') == ['a', 'c', '', '']
+
+    copied = duplicate.copyTo(FIXED_SPREADSHEET)
+    assert copied == FIXED_SPREADSHEET[-1]
+    assert copied.getRows() == duplicate.getRows()
+
+    copiedAgain = duplicate.copyTo(destinationSpreadsheetId=FIXED_SPREADSHEET.spreadsheetId) # The original keyword still works.
+    assert copiedAgain == FIXED_SPREADSHEET[-1] # The ID of this spreadsheet adds the sheet to it locally.
+    copiedAgain.delete()
+
+    with pytest.raises(ValueError):
+        newSheet.copyRange('A1:B2', pasteType='invalid arg')
+    with pytest.raises(TypeError):
+        newSheet.copyRange('A1:B2', 'not a sheet')
+
+    copied.delete()
+    duplicate.delete()
+    newSheet.delete()
+
+
+def test_refresh_skipIfUnchanged(init, checkPreAndPostCondition):
+    FIXED_SPREADSHEET.refresh(skipIfUnchanged=True)
+    numReads = len(ezsheets._READ_REQUESTS)
+    FIXED_SPREADSHEET.refresh(skipIfUnchanged=True) # Nothing changed, so nothing is read.
+    FIXED_SPREADSHEET[0].refresh(skipIfUnchanged=True)
+    assert len(ezsheets._READ_REQUESTS) == numReads
+
+    FIXED_SPREADSHEET[0].update('A1', 'changed')
+    FIXED_SPREADSHEET[0]._cells = {} # Throw away the local data so we can tell that refresh() reads it again.
+    FIXED_SPREADSHEET.refresh(skipIfUnchanged=True)
+    assert len(ezsheets._READ_REQUESTS) > numReads
+    assert FIXED_SPREADSHEET[0].get('A1') == 'changed'
+
+    FIXED_SPREADSHEET[0].clear()
+
+
+def test_watch(init, checkPreAndPostCondition):
+    import threading
+    newSheet = FIXED_SPREADSHEET.addSheet(title='New Sheet 1', columnCount=3, rowCount=3)
+
+    events = []
+    changed = threading.Event()
+    def callback(sheet, changes):
+        events.append(changes)
+        changed.set()
+
+    with newSheet.watch(callback, minInterval=0.5, maxInterval=2) as watcher:
+        assert watcher.isRunning
+        # Make a change the watcher's local data doesn't know about:
+        ezsheets.SERVICE.spreadsheets().values().update(spreadsheetId=FIXED_SPREADSHEET.spreadsheetId,
+            range="'New Sheet 1'!B2", valueInputOption='RAW', body={'values': [['new']]}).execute()
+        assert changed.wait(30)
+    assert not watcher.isRunning
+    assert events[0] == [ezsheets.CellChange(2, 2, '', 'new')]
+    assert newSheet.get('B2') == 'new'
+
+    with pytest.raises(ValueError):
+        newSheet.watch(callback, minInterval=0)
+    with pytest.raises(ValueError):
+        newSheet.watch(callback, minInterval=10, maxInterval=5)
+
+    newSheet.delete()
+
+
+def test_query(init, checkPreAndPostCondition):
+    newSheet = FIXED_SPREADSHEET.addSheet(title='New Sheet 1', columnCount=4, rowCount=6)
+    newSheet.updateRows([['ID', 'Status', 'Owner', 'Age'],
+                         ['1', 'open', 'Alice', '30'],
+                         ['2', 'closed', 'Bob', '41'],
+                         ['3', 'open', 'Carol', 'unknown'],
+                         ['4', 'open', 'Dave', '50']])
+
+    query = newSheet.query()
+    assert query.where('Status', '==', 'open').select('ID', 'Owner').rows() == [['1', 'Alice'], ['3', 'Carol'], ['4', 'Dave']]
+    assert query.where('Status', '==', 'open').limit(2).select('ID').rows() == [['1'], ['3']]
+    assert query.where('Age', '>', 35).select('Owner').rows() == [['Bob'], ['Dave']] # Number-like strs compare as numbers.
+    assert query.where('Status', '==', 'open').where('Age', '>=', 50).count() == 1
+    assert query.where('Owner', 'startswith', 'C').first() == ['3', 'open', 'Carol', 'unknown']
+    assert query.where('Owner', lambda owner: len(owner) == 3).first() == ['2', 'closed', 'Bob', '41']
+    assert list(query.where('ID', 'in', ('1', '4')).rowNumbers()) == [2, 5]
+    assert query.where('Status', '==', 'missing').first() is None
+
+    # Queries are evaluated against the current local data:
+    openQuery = query.where('Status', '==', 'open')
+    newSheet.update('B3', 'open')
+    assert openQuery.count() == 4
+
+    with pytest.raises(KeyError):
+        query.where('Nonexistent Column', '==', 'x')
+    with pytest.raises(ValueError):
+        query.where('Status', '===', 'open')
+    with pytest.raises(ValueError):
+        query.limit(-1)
+
+    newSheet.delete()
+
+
+def test_createIndex_lookup(init, checkPreAndPostCondition):
+    newSheet = FIXED_SPREADSHEET.addSheet(title='New Sheet 1', columnCount=2, rowCount=5)
+    newSheet.updateRows([['ID', 'Value'], ['a', '1'], ['b', '2'], ['a', '3']])
+
+    newSheet.createIndex('A')
+    assert newSheet.lookup('A', 'a') == 2
+    assert newSheet.lookupAll('A', 'a') == [2, 4]
+    assert newSheet.lookup('A', 'missing') is None
+    assert newSheet.lookup('B', '2') == 3 # Columns without an index are scanned.
+
+    # The index is kept up to date by writes:
+    newSheet.update('A2', 'c')
+    assert newSheet.lookupAll('A', 'a') == [4]
+    assert newSheet.lookup('A', 'c') == 2
+    newSheet.updateRow(5, ['d', '4'])
+    assert newSheet.lookup('A', 'd') == 5
+    newSheet.updateColumn('A', ['ID', 'e'])
+    assert newSheet.lookup('A', 'c') is None
+    assert newSheet.lookup('A', 'e') == 2
+    newSheet.refresh()
+    assert newSheet.lookup('A', 'e') == 2
+    newSheet.clear()
+    assert newSheet.lookup('A', 'e') is None
+
+    newSheet.dropIndex('A')
+    with pytest.raises(KeyError):
+        newSheet.dropIndex('A')
+    with pytest.raises(IndexError):
+        newSheet.createIndex(0)
+
+    newSheet.delete()
+
+
+def test_upsertRows(init, checkPreAndPostCondition):
+    newSheet = FIXED_SPREADSHEET.addSheet(title='New Sheet 1', columnCount=3, rowCount=3)
+    newSheet.updateRows([['ID', 'Status', 'Owner'], ['1', 'open', 'Alice'], ['2', 'closed', 'Bob']])
+
+    result = newSheet.upsertRows([{'ID': '1', 'Status': 'closed', 'Owner': 'Alice'},
+                                  {'ID': '3', 'Status': 'open'},
+                                  {'ID': '2', 'Owner': 'Bob'}], key='ID')
+    assert result == ezsheets.UpsertResult(updatedRows=1, appendedRows=1, updatedCells=4)
+    assert newSheet.rowCount == 4
+    expectedRows = [['ID', 'Status', 'Owner'], ['1', 'closed', 'Alice'], ['2', 'closed', 'Bob'], ['3', 'open', '']]
+    assert newSheet.getRows() == expectedRows
+    newSheet.refresh()
+    assert newSheet.getRows() == expectedRows
+
+    # Nothing changed, so nothing is written:
+    assert newSheet.upsertRows([{'ID': '3', 'Status': 'open'}], key='ID') == ezsheets.UpsertResult(0, 0, 0)
+
+    # Key values match as strs, and records with the same key are merged into one write:
+    result = newSheet.upsertRows([{'ID': 2, 'Status': 'open'}, {'ID': '2', 'Owner': 'Bea'}], key='ID')
+    assert result == ezsheets.UpsertResult(updatedRows=1, appendedRows=0, updatedCells=2)
+    assert newSheet.getRow(3) == ['2', 'open', 'Bea']
+
+    with pytest.raises(KeyError):
+        newSheet.upsertRows([{'ID': '1', 'Nonexistent Column': 'x'}], key='ID')
+    with pytest.raises(KeyError):
+        newSheet.upsertRows([{'ID': '1'}], key='Nonexistent Column')
+    with pytest.raises(ValueError):
+        newSheet.upsertRows([{'Status': 'open'}], key='ID')
+    with pytest.raises(TypeError):
+        newSheet.upsertRows([['1', 'open']], key='ID')
+
+    newSheet.delete()
+
+
+def test_sort_deleteDuplicates_trimWhitespace(init, checkPreAndPostCondition):
+    newSheet = FIXED_SPREADSHEET.addSheet(title='New Sheet 1', columnCount=2, rowCount=5)
+    newSheet.updateRows([['Name', 'Score'], ['Bob', '2'], ['  Alice   Smith ', '3'], ['Bob', '2'], ['Carol', '1']])
+
+    newSheet.sort('A2:B5', keys=[('B', 'desc'), 'A'])
+    expectedRows = [['Name', 'Score'], ['  Alice   Smith ', '3'], ['Bob', '2'], ['Bob', '2'], ['Carol', '1']]
+    assert newSheet.getRows() == expectedRows
+
+    assert newSheet.deleteDuplicates('A2:B5', columns=['A']) == 1
+    assert newSheet.getRow(4) == ['Carol', '1']
+    assert newSheet.getRow(5) == ['', '']
+
+    assert newSheet.trimWhitespace('A:A') == 1
+    assert newSheet['A2'] == 'Alice Smith'
+    newSheet.refresh()
+    assert newSheet['A2'] == 'Alice Smith'
+
+    with pytest.raises(ValueError):
+        newSheet.sort('A2:B5', keys=[('A', 'sideways')])
+    with pytest.raises(ValueError):
+        newSheet.sort('A2:A5', keys=['B'])
+    with pytest.raises(TypeError):
+        newSheet.sort('A2:B5', keys=[])
+
+    newSheet.delete()
+
+
+def test_format(init, checkPreAndPostCondition):
+    newSheet = FIXED_SPREADSHEET.addSheet(title='New Sheet 1', columnCount=3, rowCount=3)
+
+    formatter = newSheet.format()
+    formatter.bold('A1:C1').italic('A1:C1').background('A2:A', 'light gray').numberFormat('C:C', '0.00')
+    formatter.columnWidth('A', 200).columnWidth('B:C', 100).rowHeight(1, 40)
+    requests = formatter.getRequests()
+    assert len(requests) == 6 # 3 repeatCell requests and 3 updateDimensionProperties requests.
+    assert requests[0]['repeatCell']['fields'] == 'userEnteredFormat.textFormat.bold,userEnteredFormat.textFormat.italic'
+    assert requests[4]['updateDimensionProperties']['range']['startIndex'] == 1
+    assert requests[4]['updateDimensionProperties']['range']['endIndex'] == 3
+    assert 'endRowIndex' not in requests[1]['repeatCell']['range'] # Open-ended ranges stay open-ended, so they cover rows added later.
+
+    with newSheet.format() as f:
+        f.bold('A1:C1')
+        f.numberFormat('C:C', '0.00')
+        f.background('A2:A', 'light gray')
+        f.columnWidth('A', 200)
+
+    # Nothing is sent when the with block raises an exception:
+    with pytest.raises(ZeroDivisionError):
+        with newSheet.format() as f:
+            f.bold('A1')
+            1 / 0
+
+    with pytest.raises(ValueError):
+        newSheet.format().background('A1', 'not a color')
+    with pytest.raises(ValueError):
+        newSheet.format().numberFormat('A1', '0.00', formatType='NOT A TYPE')
+    with pytest.raises(TypeError):
+        newSheet.format().columnWidth('A', 'wide')
+
+    newSheet.delete()
+
+
+def test_structuralBatch(init, checkPreAndPostCondition):
+    with FIXED_SPREADSHEET.structuralBatch():
+        newSheet1 = FIXED_SPREADSHEET.addSheet(title='New Sheet 1', columnCount=3, rowCount=4)
+        newSheet2 = FIXED_SPREADSHEET.addSheet(title='New Sheet 2')
+        newSheet1.tabColor = 'red'
+        newSheet1.frozenRowCount = 1
+        newSheet2.title = 'Renamed Sheet 2'
+        newSheet2.index = 0
+
+        # The local objects are updated before the requests are sent:
+        assert FIXED_SPREADSHEET.sheetTitles[0] == 'Renamed Sheet 2'
+        assert newSheet1.frozenRowCount == 1
+
+    assert FIXED_SPREADSHEET.sheetTitles[0] == 'Renamed Sheet 2'
+    assert FIXED_SPREADSHEET.sheetTitles[-1] == 'New Sheet 1'
+    FIXED_SPREADSHEET.refresh()
+    assert FIXED_SPREADSHEET.sheetTitles[0] == 'Renamed Sheet 2'
+    assert newSheet1.columnCount == 3
+    assert newSheet1.rowCount == 4
+    assert newSheet1.frozenRowCount == 1
+    assert newSheet1.tabColor == ezsheets._getTabColorArg('red')
+
+    # An exception in the block sends nothing and undoes the local changes:
+    with pytest.raises(ZeroDivisionError):
+        with FIXED_SPREADSHEET.structuralBatch():
+            newSheet1.title = 'Not Sent'
+            1 / 0
+    assert newSheet1.title == 'New Sheet 1'
+
+    # Writing cells in the block sends the queued changes first, so the write can go to a new sheet:
+    with FIXED_SPREADSHEET.structuralBatch():
+        newSheet3 = FIXED_SPREADSHEET.addSheet(title='New Sheet 3', columnCount=2, rowCount=2)
+        newSheet3.update('B2', 'written')
+        newSheet3.format().bold('A1:B2').apply() # Formatting joins the batch, after the new sheet.
+    newSheet3.refresh()
+    assert newSheet3.get('B2') == 'written'
+    newSheet3.delete()
+
+    with FIXED_SPREADSHEET.structuralBatch():
+        newSheet1.delete()
+        newSheet2.delete()
+    assert 'New Sheet 1' not in FIXED_SPREADSHEET.sheetTitles
+    assert 'Renamed Sheet 2' not in FIXED_SPREADSHEET.sheetTitles
+
+
+def test_addSheet_addSheets(init, checkPreAndPostCondition):
+    newSheet = FIXED_SPREADSHEET.addSheet(title='New Sheet 1', columnCount=3, rowCount=4)
+    assert newSheet is FIXED_SPREADSHEET.sheets[-1]
+    assert newSheet.title == 'New Sheet 1'
+    assert (newSheet.columnCount, newSheet.rowCount) == (3, 4)
+    assert newSheet.getRows() == [['', '', ''], ['', '', ''], ['', '', ''], ['', '', '']]
+
+    newSheets = FIXED_SPREADSHEET.addSheets(['New Sheet 2', {'title': 'New Sheet 3', 'index': 0, 'rowCount': 5}])
+    assert [sheet.title for sheet in newSheets] == ['New Sheet 2', 'New Sheet 3']
+    assert FIXED_SPREADSHEET.sheetTitles[0] == 'New Sheet 3'
+    assert FIXED_SPREADSHEET.sheetTitles[-1] == 'New Sheet 2'
+    assert newSheets[1].rowCount == 5
+
+    sheetTitles = FIXED_SPREADSHEET.sheetTitles
+    FIXED_SPREADSHEET.refresh()
+    assert FIXED_SPREADSHEET.sheetTitles == sheetTitles
+    assert FIXED_SPREADSHEET['New Sheet 3'].rowCount == 5
+
+    with pytest.raises(TypeError):
+        FIXED_SPREADSHEET.addSheets('New Sheet 4')
+    with pytest.raises(ValueError):
+        FIXED_SPREADSHEET.addSheet(title='New Sheet 4', rowCount=0)
+
+    for sheet in [newSheet] + newSheets:
+        sheet.delete()
+
+
+def test_deleteSheets(init, checkPreAndPostCondition):
+    sheetTitles = FIXED_SPREADSHEET.sheetTitles
+    newSheets = FIXED_SPREADSHEET.addSheets(['New Sheet 1', 'New Sheet 2', 'New Sheet 3', 'New Sheet 4'])
+
+    FIXED_SPREADSHEET.deleteSheets([newSheets[0], 'New Sheet 2', newSheets[0]])
+    assert FIXED_SPREADSHEET.sheetTitles == sheetTitles + ('New Sheet 3', 'New Sheet 4')
+
+    del FIXED_SPREADSHEET[len(sheetTitles):]
+    assert FIXED_SPREADSHEET.sheetTitles == sheetTitles
+    FIXED_SPREADSHEET.refresh()
+    assert FIXED_SPREADSHEET.sheetTitles == sheetTitles
+
+    with pytest.raises(ValueError):
+        FIXED_SPREADSHEET.deleteSheets(list(range(len(FIXED_SPREADSHEET.sheets))))
+    with pytest.raises(TypeError):
+        FIXED_SPREADSHEET.deleteSheets(0)
+
+
+def test_writeBehind(init, checkPreAndPostCondition):
+    newSheet = FIXED_SPREADSHEET.addSheet(title='New Sheet 1', columnCount=3, rowCount=3)
+
+    with FIXED_SPREADSHEET.writeBehind(flushInterval=60) as writeBehindQueue:
+        newSheet.update('A1', 'first')
+        newSheet.update('A1', 'second')
+        newSheet.updateRow(2, ['x', 'y', 'z'])
+        assert newSheet['A1'] == 'second' # The local data changes right away.
+        writeBehindQueue.flush()
+
+        newSheet.update('B1', 'queued')
+        newSheet.refresh() # Refreshing flushes the queued write first.
+        assert newSheet['B1'] == 'queued'
+
+        with pytest.raises(ezsheets.EZSheetsException):
+            FIXED_SPREADSHEET.writeBehind()
+        newSheet.update('C1', 'closed')
+
+    assert FIXED_SPREADSHEET._writeBehind is None
+    newSheet.refresh()
+    assert newSheet.getRows() == [['second', 'queued', 'closed'], ['x', 'y', 'z'], ['', '', '']]
+
+    errors = []
+    with FIXED_SPREADSHEET.writeBehind(onError=lambda exc, valueRanges: errors.append(valueRanges)):
+        newSheet._title = 'Nonexistent Sheet' # Make the queued write fail.
+        newSheet.update('A1', 'not written')
+        newSheet._title = 'New Sheet 1'
+    assert len(errors) == 1
+
+    # Renaming the sheet sends the queued writes first, while their ranges still use the old title:
+    with FIXED_SPREADSHEET.writeBehind(flushInterval=60) as writeBehindQueue:
+        newSheet.update('A3', 'before rename')
+        newSheet.title = 'Renamed Sheet 1'
+        writeBehindQueue.flush()
+    newSheet.refresh()
+    assert newSheet['A3'] == 'before rename'
+    newSheet.title = 'New Sheet 1'
+
+    with pytest.raises(ValueError):
+        FIXED_SPREADSHEET.writeBehind(flushInterval=0)
+
+    newSheet.delete()
+
+
+def test_appendRows(init, checkPreAndPostCondition):
+    newSheet = FIXED_SPREADSHEET.addSheet(title='New Sheet 1', columnCount=3, rowCount=3)
+    newSheet.updateRows([['Time', 'Event', 'User'], ['1', 'login', 'alice']])
+
+    assert newSheet.appendRows([['2', 'logout', 'alice'], ['3', 'login', 'bob'], ['4', 'logout']], chunkRows=2) == 3
+    assert newSheet.rowCount == 6 # The appended rows were inserted after the table, so row 3 is pushed down.
+    expectedRows = [['Time', 'Event', 'User'], ['1', 'login', 'alice'], ['2', 'logout', 'alice'],
+                    ['3', 'login', 'bob'], ['4', 'logout', ''], ['', '', '']]
+    assert newSheet.getRows() == expectedRows
+    newSheet.refresh()
+    assert newSheet.getRows() == expectedRows
+
+    assert newSheet.appendRows([]) is None
+    with pytest.raises(TypeError):
+        newSheet.appendRows(['not a row'])
+    with pytest.raises(ValueError):
+        newSheet.appendRows([['5']], chunkRows=0)
+
+    newSheet.delete()
+
+
+def test_load(init, checkPreAndPostCondition, tmpdir):
+    newSheet = FIXED_SPREADSHEET.addSheet(title='New Sheet 1', columnCount=2, rowCount=2)
+
+    rows = ([str(i), str(i * i)] for i in range(1, 8)) # A generator, so the row count isn't known.
+    assert newSheet.load(rows, startCell='A2', chunkRows=3, workers=2) == 7
+    assert newSheet.rowCount == 8
+    assert newSheet.getRow(8) == ['7', '49']
+    newSheet.refresh()
+    assert newSheet.getRow(2) == ['1', '1']
+    assert newSheet.getRow(8) == ['7', '49']
+
+    csvFilename = str(tmpdir.join('data.csv'))
+    with open(csvFilename, 'w') as fo:
+        fo.write('a,b,c\n' * 10)
+    assert newSheet.load(csvFilename, chunkRows=4, rowCount=10, updateCache=False) == 10
+    assert newSheet.getRow(1) == ['', '', ''] # The local data wasn't updated.
+    assert (newSheet.columnCount, newSheet.rowCount) == (3, 10)
+    newSheet.refresh()
+    assert newSheet.getRow(10) == ['a', 'b', 'c']
+
+    with pytest.raises(ValueError):
+        newSheet.load([['x']], workers=0)
+
+    newSheet.delete()
+
+
+def test_splitLargeWrites(init, checkPreAndPostCondition, monkeypatch):
+    newSheet = FIXED_SPREADSHEET.addSheet(title='New Sheet 1', columnCount=3, rowCount=6)
+    monkeypatch.setattr(ezsheets, 'MAX_REQUEST_BYTES', 60) # Force writes to be split into bands of about 2 rows.
+
+    rows = [['row%s' % (i), 'b', 'c'] for i in range(1, 7)]
+    newSheet.updateRows(rows)
+    newSheet.refresh()
+    assert newSheet.getRows() == rows
+
+    # A band that fails is reported, and can be resumed:
+    newSheet._title = 'Nonexistent Sheet'
+    with pytest.raises(ezsheets.PartialWriteError) as excInfo:
+        newSheet.updateRange('A1:C6', [['x', 'y', 'z']] * 6)
+    newSheet._title = 'New Sheet 1'
+    assert excInfo.value.succeededRanges == []
+    assert len(excInfo.value.failedRanges) > 1
+    with pytest.raises(ezsheets.PartialWriteError):
+        excInfo.value.resume() # The bands' ranges still name the nonexistent sheet.
+
+    newSheet.delete()
+
+
+def test_fanout(init, checkPreAndPostCondition):
+    progress = []
+    result = ezsheets.fanout([FIXED_SPREADSHEET.spreadsheetId, 'nonexistentSpreadsheetId'],
+                             lambda spreadsheet: spreadsheet.title, concurrency=2, progressCallback=progress.append)
+    assert result.results == {FIXED_SPREADSHEET.spreadsheetId: FIXED_SPREADSHEET.title}
+    assert list(result.errors) == ['nonexistentSpreadsheetId']
+    assert result.requestCount >= 2
+    assert [p.completed for p in progress] == [1, 2]
+    assert progress[-1].total == 2
+    assert progress[-1].failed == 1
+
+    with pytest.raises(ValueError):
+        ezsheets.fanout([FIXED_SPREADSHEET.spreadsheetId], lambda spreadsheet: None, concurrency=0)
+    with pytest.raises(TypeError):
+        ezsheets.fanout([FIXED_SPREADSHEET.spreadsheetId], 'not callable')
+
+
 def test_getitem(init, checkPreAndPostCondition):
     pass # TODO LEFT OFF
 